@@ -0,0 +1,226 @@
+"""Local stand-ins for Ollama and RSS feeds so benchmarks run offline.
+
+Both servers bind to 127.0.0.1 on an ephemeral port and run in a daemon thread:
+
+    with FakeOllama(latency=0.05, chunk_rate=400) as ollama, RSSFixture(feeds=8) as rss:
+        ollama.url, rss.urls
+"""
+import hashlib
+import json
+import random
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_TEXT = "Use an EKF over IMU and GPS, then tune process noise on bag replays.\n" * 8
+
+
+def codegen_response(files: int = 20, lines: int = 40) -> str:
+    parts = ["Here is the package.\n"]
+    for i in range(files):
+        body = "\n".join(f"value_{j} = {j}  # generated line" for j in range(lines))
+        parts.append(f"# filename: pkg/module_{i}.py\n```python\n{body}\n```\n")
+    return "\n".join(parts)
+
+
+def _digest_response(prompt: str) -> str:
+    # Scoring and summary prompts get well-formed JSON, like a cooperative model
+    if "Output JSON only" in prompt:
+        ids = [line.split(" | ", 1)[0] for line in prompt.splitlines() if " | " in line]
+        return json.dumps({"scores": {i: random.Random(i).randint(0, 10) for i in ids if i.isdigit()}})
+    if "one_liner" in prompt:
+        ids = [line.split(" | ", 1)[0] for line in prompt.splitlines() if " | " in line]
+        highlights = [{"id": int(i), "category": "🔬 Research", "summary": f"Summary {i}."} for i in ids if i.isdigit()]
+        return json.dumps({"highlights": highlights, "one_liner": "Benchmark day."})
+    return None
+
+
+class _Server:
+    handler = None
+
+    def __init__(self):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), self.handler)
+        self.httpd.daemon_threads = True
+        self.httpd.fixture = self
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class _OllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; with Nagle on, keep-alive
+    # clients wait ~40 ms on delayed ACK for every response
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def _json(self, obj: dict):
+        body = json.dumps(obj).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _chunk(self, obj: dict):
+        data = (json.dumps(obj) + "\n").encode()
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def do_GET(self):
+        fake = self.server.fixture
+        self._json({"models": [{"name": m} for m in fake.models]})
+
+    def do_POST(self):
+        fake = self.server.fixture
+        req = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        fake.requests += 1
+        generate = self.path == "/api/generate"
+        prompt = req.get("prompt", "") if generate else "\n".join(m["content"] for m in req.get("messages", []))
+        text = fake.respond(prompt)
+        time.sleep(fake.latency)
+        words = max(1, len(text) // fake.chunk_size)
+        stats = {
+            "total_duration": int((fake.latency + words / fake.chunk_rate) * 1e9),
+            "load_duration": 0,
+            "prompt_eval_count": len(prompt) // 4,
+            "prompt_eval_duration": int(fake.latency * 1e9),
+            "eval_count": words,
+            "eval_duration": int(words / fake.chunk_rate * 1e9),
+        }
+        done = {"model": req.get("model"), "done": True, **stats}
+        if generate:
+            done.update(response="", context=list(range(len(prompt) // 4)))
+        else:
+            done["message"] = {"role": "assistant", "content": ""}
+
+        if not req.get("stream", True):
+            if generate:
+                done["response"] = text
+            else:
+                done["message"]["content"] = text
+            self._json(done)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        delay = 1 / fake.chunk_rate
+        for i in range(0, len(text), fake.chunk_size):
+            piece = text[i:i + fake.chunk_size]
+            if generate:
+                self._chunk({"model": req.get("model"), "response": piece, "done": False})
+            else:
+                self._chunk({"model": req.get("model"), "message": {"role": "assistant", "content": piece}, "done": False})
+            time.sleep(delay)
+        self._chunk(done)
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+
+class FakeOllama(_Server):
+    # latency: seconds before the first token; chunk_rate: chunks/second;
+    # responses: [(substring, text)] checked in order against the prompt
+    handler = _OllamaHandler
+
+    def __init__(self, latency: float = 0.05, chunk_rate: float = 500.0, chunk_size: int = 8,
+                 responses=None, default: str = DEFAULT_TEXT, models=("qwen2.5:14b",)):
+        super().__init__()
+        self.latency = latency
+        self.chunk_rate = chunk_rate
+        self.chunk_size = chunk_size
+        self.responses = list(responses or [])
+        self.default = default
+        self.models = list(models)
+        self.requests = 0
+
+    def respond(self, prompt: str) -> str:
+        for needle, text in self.responses:
+            if needle in prompt:
+                return text
+        return _digest_response(prompt) or self.default
+
+
+class _RSSHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        fixture = self.server.fixture
+        body = fixture.feeds.get(self.path)
+        if body is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        time.sleep(fixture.latency)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/rss+xml")
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+TOPICS = ["SLAM", "motion planning", "MPC", "grasping", "sim-to-real", "ROS 2", "drone control",
+          "LiDAR odometry", "diffusion policy", "legged locomotion", "Gazebo", "perception"]
+
+
+class RSSFixture(_Server):
+    handler = _RSSHandler
+
+    def __init__(self, feeds: int = 8, items: int = 15, latency: float = 0.0, seed: int = 0):
+        super().__init__()
+        self.latency = latency
+        rng = random.Random(seed)
+        self.feeds = {}
+        for f in range(feeds):
+            entries = []
+            for i in range(items):
+                topic = rng.choice(TOPICS)
+                entries.append(
+                    f"<item><title>{topic.title()} result {f}-{i}</title>"
+                    f"<link>https://example.org/{f}/{i}</link>"
+                    f"<description>New work on {topic} for {rng.choice(TOPICS)} with real robots.</description>"
+                    f"<pubDate>{formatdate(0)}</pubDate></item>"
+                )
+            self.feeds[f"/feed{f}.xml"] = (
+                f'<?xml version="1.0"?><rss version="2.0"><channel><title>Fixture {f}</title>'
+                + "".join(entries) + "</channel></rss>"
+            ).encode()
+
+    @property
+    def urls(self) -> list:
+        return [self.url + path for path in self.feeds]
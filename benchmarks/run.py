@@ -0,0 +1,270 @@
+"""Offline benchmark suite for robodev's own overhead.
+
+Everything runs against local fixtures (benchmarks/fixtures.py) inside a
+throwaway HOME, so no model, network or user state is touched:
+
+    python benchmarks/run.py                       # run and print a table
+    python benchmarks/run.py --json results.json   # also write machine-readable results
+    python benchmarks/run.py --save-baseline       # store results as benchmarks/baseline.json
+    python benchmarks/run.py --baseline benchmarks/baseline.json --tolerance 0.3
+
+With a baseline, a case regresses when its median is more than `tolerance`
+slower and at least --min-delta-ms slower; any regression exits 1.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+# robodev derives all of its state paths from HOME at import time
+HOME = Path(tempfile.mkdtemp(prefix="robodev-bench-"))
+os.environ["HOME"] = str(HOME)
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fixtures import FakeOllama, RSSFixture, codegen_response
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+CASES = {}
+
+
+def case(name):
+    def register(fn):
+        CASES[name] = fn
+        return fn
+    return register
+
+
+def timed(fn, runs: int, setup=None) -> dict:
+    samples = []
+    for _ in range(runs):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {"median_ms": round(statistics.median(samples), 2), "min_ms": round(min(samples), 2), "runs": runs}
+
+
+def write_llm_config(ollama: FakeOllama):
+    config = HOME / ".robodev" / "llm_config.json"
+    config.parent.mkdir(parents=True, exist_ok=True)
+    config.write_text(json.dumps({"host": ollama.url, "cache": {"enabled": False}}))
+
+
+def synthetic_log(path: Path, lines: int = 50000):
+    with path.open("w") as f:
+        for i in range(lines):
+            if i % 5000 == 4999:
+                f.write(f"/ws/src/pkg_{i % 7}/src/node.cpp:{i % 300}:12: error: 'foo_{i % 3}' was not declared in this scope\n")
+            elif i % 997 == 0:
+                f.write(f"/ws/src/pkg/src/x.cpp:{i}:1: warning: unused variable 'tmp{i}' [-Wunused-variable]\n")
+            else:
+                f.write(f"[ {i % 100:3d}%] Building CXX object src/CMakeFiles/target_{i % 40}.dir/file_{i}.cpp.o\n")
+
+
+def synthetic_workspace(root: Path, packages: int = 150, files: int = 12):
+    for p in range(packages):
+        pkg = root / "src" / f"pkg_{p}"
+        (pkg / "src").mkdir(parents=True, exist_ok=True)
+        (pkg / "include" / f"pkg_{p}").mkdir(parents=True, exist_ok=True)
+        deps = "".join(f"<depend>pkg_{d}</depend>" for d in range(max(0, p - 3), p))
+        (pkg / "package.xml").write_text(
+            f'<?xml version="1.0"?><package format="3"><name>pkg_{p}</name><version>0.1.0</version>'
+            f"{deps}<export><build_type>ament_cmake</build_type></export></package>"
+        )
+        (pkg / "CMakeLists.txt").write_text(f"project(pkg_{p})\nfind_package(ament_cmake REQUIRED)\n")
+        for f in range(files):
+            (pkg / "src" / f"node_{f}.cpp").write_text(f"// node {f}\nint main() {{ return {f}; }}\n")
+            (pkg / "include" / f"pkg_{p}" / f"node_{f}.hpp").write_text("#pragma once\n")
+    for build_dir in ("build", "install", "log"):
+        (root / build_dir / "junk").mkdir(parents=True, exist_ok=True)
+
+
+@case("cli")
+def bench_cli(ctx, runs):
+    write_llm_config(ctx["ollama"])
+    work = HOME / "cli"
+    work.mkdir(exist_ok=True)
+    log = work / "build.log"
+    synthetic_log(log, lines=5000)
+    env = {**os.environ, "PYTHONPATH": str(ROOT)}
+    base = [sys.executable, "-m", "robodev.cli"]
+    commands = {
+        "help": ["--help"],
+        "config": ["config", "--show"],
+        "brainstorm": ["--no-daemon", "--no-cache", "brainstorm", "EKF tuning for a quadrotor"],
+        "codegen": ["--no-daemon", "--no-cache", "--no-stream", "codegen", "lidar node", "--out", str(work / "gen")],
+        "diagnose": ["--no-daemon", "--no-cache", "diagnose", "--log", str(log), "--refresh"],
+    }
+    results = {}
+    for name, args in commands.items():
+        def run():
+            proc = subprocess.run(base + args, cwd=work, env=env, capture_output=True, text=True)
+            if proc.returncode != 0:
+                raise RuntimeError(f"robodev {' '.join(args)} failed: {proc.stderr[-400:]}")
+        results[f"cli.{name}"] = timed(run, runs)
+    return results
+
+
+@case("llm_stream")
+def bench_llm_stream(ctx, runs):
+    from robodev.llm_client import OllamaClient
+    fast = ctx["fast_ollama"]
+    client = OllamaClient(host=fast.url, cache=False)
+    chunks = len(fast.default) // fast.chunk_size
+
+    def stream():
+        for _ in client.chat_stream("stream please", task="brainstorm"):
+            pass
+    result = timed(stream, runs)
+    result["chunks_per_s"] = round(chunks / (result["median_ms"] / 1000))
+    return {"llm.chat_stream": result, "llm.chat": timed(lambda: client.chat("hi", task="brainstorm"), runs)}
+
+
+@case("write_artifacts")
+def bench_write_artifacts(ctx, runs):
+    from robodev.artifacts import write_artifacts
+    text = codegen_response(files=200, lines=60)
+    out = HOME / "artifacts"
+    return {
+        "write_artifacts.fresh": timed(lambda: write_artifacts(text, out), runs,
+                                       setup=lambda: shutil.rmtree(out, ignore_errors=True)),
+        "write_artifacts.rewrite": timed(lambda: write_artifacts(text, out), runs),
+    }
+
+
+@case("project_tree")
+def bench_project_tree(ctx, runs):
+    from robodev import project
+    from robodev.project import list_project_tree
+    ws = HOME / "ws"
+    synthetic_workspace(ws)
+    return {
+        "project_tree.cold": timed(lambda: list_project_tree(ws), runs,
+                                   setup=lambda: shutil.rmtree(project.INDEX_DIR, ignore_errors=True)),
+        "project_tree.warm": timed(lambda: list_project_tree(ws), runs),
+    }
+
+
+@case("diagnose_log")
+def bench_diagnose_log(ctx, runs):
+    from robodev.diagnosis_store import log_signature
+    from robodev.logreduce import reduce_log
+    log = HOME / "big.log"
+    synthetic_log(log, lines=200000)
+    return {"diagnose_log.reduce": timed(lambda: log_signature(reduce_log(log)), runs)}
+
+
+@case("digest")
+def bench_digest(ctx, runs):
+    try:
+        import feedparser  # noqa: F401
+        import requests  # noqa: F401
+    except ImportError as e:
+        return {"digest": {"skipped": f"{e.name} not installed"}}
+    from robodev.daily_digest import feed_parser
+    from robodev.daily_digest.relevant_feeds import build_digest
+    from robodev.llm_client import OllamaClient
+    from robodev.memory import AgentMemory
+    write_llm_config(ctx["ollama"])
+    mem = AgentMemory.load()
+    mem.data["feeds"] = ctx["rss"].urls
+    client = OllamaClient(cache=False)
+
+    def run():
+        build_digest(client, mem, force=True)
+
+    return {
+        "digest.cold": timed(run, max(1, runs // 2),
+                             setup=lambda: shutil.rmtree(feed_parser.CACHE_DIR, ignore_errors=True)),
+        "digest.warm": timed(run, runs),
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float, min_delta_ms: float) -> list:
+    regressions = []
+    for name, r in results.items():
+        base = baseline.get(name, {})
+        if "median_ms" not in r or "median_ms" not in base:
+            continue
+        delta = r["median_ms"] - base["median_ms"]
+        if r["median_ms"] > base["median_ms"] * (1 + tolerance) and delta >= min_delta_ms:
+            regressions.append(f"{name}: {base['median_ms']}ms -> {r['median_ms']}ms (+{delta:.1f}ms)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--only", nargs="*", choices=sorted(CASES), help="Run a subset of cases")
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake model time-to-first-token (s)")
+    parser.add_argument("--chunk-rate", type=float, default=500.0, help="Fake model chunks per second")
+    parser.add_argument("--json", type=str, default=None, help="Write results to this file")
+    parser.add_argument("--baseline", type=str, default=None, help=f"Compare against a stored baseline (default: {DEFAULT_BASELINE.name} if present)")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="Allowed fractional slowdown vs baseline")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0, help="Ignore slowdowns smaller than this")
+    args = parser.parse_args()
+
+    ollama = FakeOllama(latency=args.latency, chunk_rate=args.chunk_rate,
+                        responses=[("# filename:", codegen_response())]).start()
+    fast_ollama = FakeOllama(latency=0.0, chunk_rate=1e9, default=codegen_response(files=50)).start()
+    rss = RSSFixture(feeds=8, items=15).start()
+    ctx = {"ollama": ollama, "fast_ollama": fast_ollama, "rss": rss}
+    results = {}
+    try:
+        for name in args.only or CASES:
+            results.update(CASES[name](ctx, args.runs))
+    finally:
+        for server in (ollama, fast_ollama, rss):
+            server.stop()
+        shutil.rmtree(HOME, ignore_errors=True)
+
+    report = {
+        "meta": {"python": platform.python_version(), "platform": platform.platform(),
+                 "time": time.strftime("%Y-%m-%dT%H:%M:%S"), "runs": args.runs,
+                 "latency": args.latency, "chunk_rate": args.chunk_rate},
+        "results": results,
+    }
+    for name, r in results.items():
+        if "skipped" in r:
+            print(f"{name:28} skipped ({r['skipped']})")
+            continue
+        extra = f" | {r['chunks_per_s']} chunks/s" if "chunks_per_s" in r else ""
+        print(f"{name:28} median {r['median_ms']:9.2f}ms | min {r['min_ms']:9.2f}ms{extra}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2))
+    if args.save_baseline:
+        DEFAULT_BASELINE.write_text(json.dumps(report, indent=2))
+        print(f"Saved baseline to {DEFAULT_BASELINE}")
+        return
+
+    baseline_path = Path(args.baseline) if args.baseline else DEFAULT_BASELINE
+    if not baseline_path.exists():
+        # Say so: a missing baseline must not read as a clean run
+        print(f"⚠ No baseline at {baseline_path}; nothing compared (create one with --save-baseline)")
+        sys.exit(2 if args.baseline else 0)
+    baseline = json.loads(baseline_path.read_text())["results"]
+    regressions = compare(results, baseline, args.tolerance, args.min_delta_ms)
+    for r in regressions:
+        print(f"❌ regression {r}")
+    if not regressions:
+        print(f"✅ no regressions vs {baseline_path}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
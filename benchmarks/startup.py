@@ -0,0 +1,95 @@
+"""CLI startup benchmark.
+
+Runs cheap subcommands under `python -X importtime` and fails when the median
+wall time crosses a threshold or when heavy modules leak into the startup path.
+
+    python benchmarks/startup.py [--runs 7] [--max-ms 100] [--json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+CASES = {
+    "help": ["--help"],
+    "config": ["config", "--show"],
+}
+# None of these are needed to print help or config
+FORBIDDEN = ("robodev.agent", "robodev.llm_client", "robodev.prompts", "asyncio", "feedparser", "requests")
+
+
+def parse_importtime(stderr: str) -> dict:
+    # "import time: self [us] | cumulative | name"; top-level imports have no indent
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative, raw_name = line[len("import time:"):].split("|")
+        modules[raw_name.strip()] = {"self_us": int(self_us), "cumulative_us": int(cumulative),
+                                     "top_level": not raw_name[1:].startswith(" ")}
+    return modules
+
+
+def _run(cmd: list, env: dict) -> subprocess.CompletedProcess:
+    proc = subprocess.run(cmd, capture_output=True, text=True, cwd=ROOT, env=env)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{' '.join(cmd)} exited {proc.returncode}: {proc.stderr[-500:]}")
+    return proc
+
+
+def run_case(args: list, runs: int) -> dict:
+    cmd = [sys.executable, "-m", "robodev.cli"] + args
+    env = {**os.environ, "PYTHONPATH": str(ROOT)}
+    # -X importtime itself slows startup, so wall time comes from plain runs
+    imports = parse_importtime(_run([sys.executable, "-X", "importtime"] + cmd[1:], env).stderr)
+    walls = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        _run(cmd, env)
+        walls.append((time.perf_counter() - start) * 1000)
+    import_ms = sum(m["cumulative_us"] for m in imports.values() if m["top_level"]) / 1000
+    slowest = sorted(imports.items(), key=lambda kv: kv[1]["self_us"], reverse=True)[:8]
+    return {
+        "wall_ms": round(statistics.median(walls), 1),
+        "import_ms": round(import_ms, 1),
+        "modules": len(imports),
+        "forbidden": [m for m in FORBIDDEN if m in imports],
+        "slowest": [[name, m["self_us"]] for name, m in slowest],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--max-ms", type=float, default=100.0, help="Median wall-time budget per case")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = {name: run_case(case, args.runs) for name, case in CASES.items()}
+    failures = []
+    for name, r in results.items():
+        if r["wall_ms"] > args.max_ms:
+            failures.append(f"{name}: {r['wall_ms']}ms > {args.max_ms}ms")
+        if r["forbidden"]:
+            failures.append(f"{name}: imports {', '.join(r['forbidden'])}")
+
+    if args.json:
+        print(json.dumps({"results": results, "failures": failures}, indent=2))
+    else:
+        for name, r in results.items():
+            print(f"{name:8} wall {r['wall_ms']:7.1f}ms | imports {r['import_ms']:6.1f}ms ({r['modules']} modules)")
+            print("         slowest: " + ", ".join(f"{n} {us / 1000:.1f}ms" for n, us in r["slowest"][:4]))
+        for f in failures:
+            print(f"❌ {f}")
+        if not failures:
+            print("✅ startup within budget")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,52 +1,153 @@
 from pathlib import Path
-from robodev.llm_client import OllamaClient
+from robodev import metrics
+from robodev.llm_client import AsyncOllamaClient, OllamaClient
 from robodev.prompts import (
     system_prompt,
     brainstorm_prompt,
     codegen_prompt,
     diagnose_prompt
 )
-from robodev.artifacts import write_artifacts
-from robodev.render import render_brainstorm, render_codegen, render_diagnose
+from robodev.artifacts import ArtifactWriter
+from robodev.render import render_brainstorm, render_codegen, render_diagnose, render_stream
 from robodev.project import list_project_tree
+from robodev.workspace import workspace_for
+from robodev.logreduce import error_signatures, reduce_log, reduce_log_text
+from robodev.diagnosis_store import DiagnosisStore, diagnosis_store, log_signature
+from robodev.session import DEFAULT_HISTORY_TOKENS, Session
 import shlex
 
+def _tee(chunks, fn):
+    for chunk in chunks:
+        if fn:
+            fn(chunk)
+        yield chunk
+
 class RoboDevAgent:
-    def __init__(self, memory):
+    def __init__(self, memory, llm: OllamaClient = None, session: Session = None, timeout: int = 600):
         self.memory = memory
-        self.llm = OllamaClient()
+        self.timeout = timeout
+        self.llm = llm or OllamaClient()
+        self.allm = AsyncOllamaClient(self.llm)
+        # None keeps one-shot calls stateless; interactive mode always has one
+        self.session = session
+        # Where streamed tokens go; the daemon points this at the client socket
+        self.out = None
+
+    @property
+    def diagnoses(self) -> DiagnosisStore:
+        # Loaded on the first diagnose, then shared by every agent in the process
+        return diagnosis_store()
+
+    def _messages(self, mode: str, task_prompt: str) -> list:
+        msgs = [{"role": "system", "content": system_prompt(self.memory)}]
+        if self.session is not None:
+            msgs += self.session.history(mode, self._history_budget())
+        msgs.append({"role": "user", "content": task_prompt})
+        return msgs
+
+    def _prompt(self, mode: str, build, **kwargs) -> list:
+        with metrics.span("prompt.build", mode=mode):
+            return self._messages(mode, build(self.memory, **kwargs))
+
+    def _history_budget(self) -> int:
+        return int(self.memory.data.get("history_tokens", DEFAULT_HISTORY_TOKENS))
+
+    def _remember(self, mode: str, user: str, resp: str):
+        if self.session is None:
+            return
+        self.session.add_turn(mode, user, resp)
+        self.session.compact(mode, self.llm, self._history_budget())
+        self.session.save()
+
+    def _complete(self, msgs, task: str, stream: bool, on_chunk=None, refresh: bool = False) -> str:
+        # on_chunk sees the response as it arrives (the whole text when not streaming);
+        # refresh=True bypasses the response cache
+        if self.session is not None and self.llm.carry_context:
+            return self._complete_in_context(msgs, task, stream, on_chunk)
+        if stream:
+            chunks = self.llm.chat_stream(msgs, timeout=self.timeout, task=task, refresh=refresh)
+            return render_stream(_tee(chunks, on_chunk), self.out)
+        resp = self.llm.chat(msgs, timeout=self.timeout, task=task, refresh=refresh)
+        if on_chunk:
+            on_chunk(resp)
+        return resp
+
+    def _complete_in_context(self, msgs, task: str, stream: bool, on_chunk=None) -> str:
+        # Continue from the session's Ollama context: only the new task prompt
+        # is sent. A fresh context starts from the stable system prefix plus
+        # the (summarized) history as a transcript.
+        context = self.session.contexts.get(task)
+        if context:
+            system, prompt = None, msgs[-1]["content"]
+        else:
+            system = "\n\n".join(m["content"] for m in msgs if m["role"] == "system")
+            turns = [m for m in msgs[:-1] if m["role"] != "system"]
+            prompt = "".join(f"{m['role'].title()}: {m['content']}\n\n" for m in turns) + msgs[-1]["content"]
+        result = {}
+        tokens = self.llm.generate_stream(prompt, system=system, context=context, timeout=self.timeout,
+                                          task=task, result=result)
+        tokens = _tee(tokens, on_chunk)
+        resp = render_stream(tokens, self.out) if stream else "".join(tokens)
+        new_context = result.get("context")
+        # Past the budget, drop it and restart from the summarized history next time
+        if new_context and len(new_context) <= self.llm.context_tokens:
+            self.session.contexts[task] = new_context
+        else:
+            self.session.contexts.pop(task, None)
+        return resp
         
-    def brainstorm(self, query: str) -> str:
-        msgs = [
-            {"role": "system", "content": system_prompt(self.memory)},
-            {"role": "user", "content": brainstorm_prompt(self.memory, query=query)}
-        ]
-        resp = self.llm.chat(msgs, task="brainstorm")
-        return render_brainstorm(resp)
+    def brainstorm(self, query: str, stream: bool = False) -> str:
+        with metrics.span("agent.brainstorm"):
+            msgs = self._prompt("brainstorm", brainstorm_prompt, query=query)
+            resp = self._complete(msgs, task="brainstorm", stream=stream)
+            self._remember("brainstorm", query, resp)
+            return render_brainstorm(resp, streamed=stream)
     
-    def codegen(self, query: str, lang: str = "python", xml: str = None, out_dir: Path = Path("./generated")) -> str:
-        msgs = [
-            {"role": "system", "content": system_prompt(self.memory)},
-            {"role": "user", "content": codegen_prompt(self.memory, query=query, lang=lang, xml=xml)}
-        ]
-        resp = self.llm.chat(msgs, task="codegen")
-        files = write_artifacts(resp, out_dir)
-        return render_codegen(resp, files)
+    def codegen(self, query: str, lang: str = "python", xml: str = None, out_dir: Path = Path("./generated"), stream: bool = False) -> str:
+        with metrics.span("agent.codegen"):
+            msgs = self._prompt("codegen", codegen_prompt, query=query, lang=lang, xml=xml)
+            # Files land on disk as each block closes, while the rest still streams
+            writer = ArtifactWriter(out_dir)
+            resp = self._complete(msgs, task="codegen", stream=stream, on_chunk=writer.feed)
+            with metrics.span("artifacts.write") as sp:
+                writer.close()
+                sp.set(written=len(writer.written), unchanged=len(writer.unchanged))
+            self._remember("codegen", query, resp)
+            return render_codegen(resp, writer.written, streamed=stream, unchanged=writer.unchanged)
     
-    def diagnose(self, log_text: str) -> str:
-        msgs = [
-            {"role": "system", "content": system_prompt(self.memory)},
-            {"role": "user", "content": diagnose_prompt(self.memory, log_text=log_text)}
-        ]
-        resp = self.llm.chat(msgs, task="diagnose")
-        return render_diagnose(resp)
+    def diagnose(self, log_text: str, stream: bool = False, refresh: bool = False, reduced: bool = False) -> str:
+        # reduced=True: the caller already cut the log to its own budget (reduce_log)
+        with metrics.span("agent.diagnose"):
+            return self._diagnose(log_text, stream, refresh, reduced)
+
+    def _diagnose(self, log_text: str, stream: bool, refresh: bool, reduced: bool) -> str:
+        # Oversized raw logs are cut down to error windows before they reach the prompt
+        with metrics.span("log.reduce", chars=len(log_text)):
+            if not reduced:
+                log_text = reduce_log_text(log_text)
+            sig = log_signature(log_text)
+        if sig and not refresh:
+            known = self.diagnoses.get(sig)
+            if known:
+                print(f"⚡ Known failure {sig} (matched {known['hits']}x) — pass --refresh for a fresh diagnosis", file=self.out)
+                self._remember("diagnose", log_text, known["diagnosis"])
+                return render_diagnose(known["diagnosis"])
+        msgs = self._prompt("diagnose", diagnose_prompt, log_text=log_text)
+        resp = self._complete(msgs, task="diagnose", stream=stream, refresh=refresh)
+        self._remember("diagnose", log_text, resp)
+        if sig:
+            self.diagnoses.put(sig, resp, error_signatures(log_text))
+        return render_diagnose(resp, streamed=stream)
     
     def interactive(self):
+        if self.session is None:
+            self.session = Session.load()
         mode = self.memory.data.get("default_mode", "brainstorm")
         prompt = f"RoboDev Interactive Mode (model = {self.memory.data.get('model')}, stack = {self.memory.data.get('stack')})> "
 
         print("Type: brainstorm|codegen|diagnose <text> | /mode <name> | /config | /exit")
         print("Shortcuts: b <text> | c <text> | d <text>")
+        print("Sessions: /session [list | new <name> | load <name> | clear]")
 
         while True:
             try:
@@ -72,6 +173,23 @@ class RoboDevAgent:
                     print("Invalid mode. Available modes: brainstorm, codegen, diagnose.")
                     continue
 
+            if line.startswith("/session"):
+                parts = line.split(maxsplit=2)
+                if len(parts) == 1:
+                    print(f"Session: {self.session.name} (~{self.session.tokens(mode)} history tokens in {mode})")
+                elif parts[1] == "list":
+                    print("\n".join(Session.list_sessions()) or "No saved sessions.")
+                elif parts[1] in ("new", "load") and len(parts) == 3:
+                    self.session = Session(parts[2]) if parts[1] == "new" else Session.load(parts[2])
+                    print(f"Session: {self.session.name}")
+                elif parts[1] == "clear":
+                    self.session.clear(mode)
+                    self.session.save()
+                    print(f"Cleared {mode} history for session {self.session.name}")
+                else:
+                    print("Usage: /session [list | new <name> | load <name> | clear]")
+                continue
+
             if line == "/config":
                 print(self.memory.pretty())
                 continue
@@ -84,6 +202,31 @@ class RoboDevAgent:
                 self.memory.save()
                 continue
 
+            if line == "/project tree":
+                root = self.memory.data.get("project_root")
+                if not root:
+                    print("Project root is not set.")
+                else:
+                    print(list_project_tree(root))
+                continue
+
+            if line.startswith(("/project deps ", "/project rdeps ", "/project owner ")) or line == "/project order":
+                root = self.memory.data.get("project_root")
+                if not root:
+                    print("Project root is not set.")
+                    continue
+                parts = line.split(maxsplit=2)
+                ws = workspace_for(root)
+                if parts[1] == "order":
+                    print(" -> ".join(ws.build_order()) or "No packages found.")
+                elif parts[1] == "deps":
+                    print(", ".join(ws.dependencies(parts[2], recursive=True)) or "No workspace dependencies.")
+                elif parts[1] == "rdeps":
+                    print(", ".join(ws.reverse_dependencies(parts[2])) or "No reverse dependencies.")
+                else:
+                    print(ws.owner_of(parts[2]) or "No owning package.")
+                continue
+
             if line.startswith("/project"):
                 parts = line.split(maxsplit=2)
                 if len(parts) == 1 or parts[1] == "show":
@@ -101,14 +244,7 @@ class RoboDevAgent:
                         self.memory.save()
                         print(f"Project root set to: {p}")
                     continue
-                print("Usage: /project show | /project set <path>")
-
-            if line == "/project tree":
-                root = self.memory.data.get("project_root")
-                if not root:
-                    print("Project root is not set.")
-                else:
-                    print(list_project_tree(root))
+                print("Usage: /project show | set <path> | tree | order | deps <pkg> | rdeps <pkg> | owner <path>")
                 continue
 
             if line.startswith("b "):
@@ -125,19 +261,25 @@ class RoboDevAgent:
                 else:
                     cmd, rest = mode, line
             
+            result = ""
             if cmd == "brainstorm":
-                print(self.brainstorm(rest))
+                result = self.brainstorm(rest, stream=True)
             elif cmd == "codegen":
                 out_dir = Path(self.memory.data.get("out_dir", "./generated"))
                 lang = self.memory.data.get("language", "python")
                 xml = self.memory.data.get("xml", None)
-                print(self.codegen(rest, lang=lang, xml=xml, out_dir=out_dir))
+                result = self.codegen(rest, lang=lang, xml=xml, out_dir=out_dir, stream=True)
             elif cmd == "diagnose":
+                refresh = rest.startswith("--refresh")
+                if refresh:
+                    rest = rest[len("--refresh"):].strip()
                 if rest.endswith(".log") or rest.endswith(".txt"):
                     p = Path(rest)
                     if p.exists():
-                        print(self.diagnose(p.read_text(encoding="utf-8", errors="ignore")))
+                        result = self.diagnose(reduce_log(p), stream=True, refresh=refresh, reduced=True)
                     else:
-                        print(f"File not found: {rest}")
+                        result = f"File not found: {rest}"
                 else:
-                    print(self.diagnose(rest))
\ No newline at end of file
+                    result = self.diagnose(rest, stream=True, refresh=refresh)
+            if result:
+                print(result)
\ No newline at end of file
@@ -1,15 +1,118 @@
-import re 
+import hashlib
+import json
+import os
+import re
+import time
 from pathlib import Path
 from typing import List
 
-FILE_RE = re.compile(r"# filename:\s*(.+)\n```[^\n]*\n(.*?)\n```", re.DOTALL)
+from robodev.project import atomic_write_text
+
+FILENAME_RE = re.compile(r"# filename:[ \t]*([^\n]+)")
+MANIFEST_NAME = ".robodev_manifest.json"
+# Generated files get the usual umask-derived mode, not mkstemp's 0600
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+FILE_MODE = 0o666 & ~_UMASK
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class ArtifactWriter:
+    # Incremental parser for `# filename:` + fenced blocks: feed() it the
+    # response as it streams and each file is written as soon as its closing
+    # fence arrives. Writes are atomic, and files whose content is unchanged
+    # are left alone so their mtimes (and downstream colcon/CMake builds) stay put.
+    def __init__(self, out_dir: Path):
+        self.out_dir = Path(out_dir)
+        self.written: List[Path] = []
+        self.unchanged: List[Path] = []
+        self._buffer = ""
+        self._name = None
+        self._body = None
+        self._manifest = self._load_manifest()
+
+    @property
+    def files(self) -> List[Path]:
+        return self.written + self.unchanged
+
+    def feed(self, chunk: str):
+        self._buffer += chunk
+        *lines, self._buffer = self._buffer.split("\n")
+        for line in lines:
+            self._line(line)
+
+    def close(self) -> List[Path]:
+        if self._buffer:
+            self._line(self._buffer)
+            self._buffer = ""
+        self._save_manifest()
+        return self.files
+
+    def _line(self, line: str):
+        if self._body is not None:
+            if line.startswith("```"):
+                self._write(self._name, "\n".join(self._body))
+                self._name = self._body = None
+            else:
+                self._body.append(line)
+            return
+        if self._name is not None and line.startswith("```"):
+            self._body = []
+            return
+        # The fence has to follow its filename line directly
+        m = FILENAME_RE.search(line)
+        self._name = m.group(1).strip() if m else None
+
+    def _write(self, name: str, content: str):
+        path = self.out_dir / name
+        if not path.resolve().is_relative_to(self.out_dir.resolve()):
+            print(f"⚠ Skipping {name}: outside {self.out_dir}")
+            return
+        data = content.encode("utf-8")
+        digest = _sha256(data)
+        if self._current_hash(name, path) == digest:
+            self.unchanged.append(path)
+            return
+        atomic_write_text(path, content, FILE_MODE)
+        st = path.stat()
+        self._manifest[name] = {"sha256": digest, "size": st.st_size, "mtime": st.st_mtime}
+        self.written.append(path)
+
+    def _current_hash(self, name: str, path: Path):
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            return None
+        entry = self._manifest.get(name)
+        # Trust the manifest while the file is exactly as we left it
+        if entry and entry["size"] == st.st_size and entry["mtime"] == st.st_mtime:
+            return entry["sha256"]
+        digest = _sha256(path.read_bytes())
+        self._manifest[name] = {"sha256": digest, "size": st.st_size, "mtime": st.st_mtime}
+        return digest
+
+    def _load_manifest(self) -> dict:
+        try:
+            return json.loads((self.out_dir / MANIFEST_NAME).read_text()).get("files", {})
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _relative(self, paths: List[Path]) -> List[str]:
+        return [str(p.relative_to(self.out_dir)) for p in paths]
+
+    def _save_manifest(self):
+        manifest = {
+            "updated": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "last_run": {"written": self._relative(self.written), "unchanged": self._relative(self.unchanged)},
+            "files": self._manifest,
+        }
+        atomic_write_text(self.out_dir / MANIFEST_NAME, json.dumps(manifest, indent=2), FILE_MODE)
+
 
 def write_artifacts(llm_text: str,  out_dir: Path) -> List[Path]:
-    out_dir.mkdir(parents=True, exist_ok=True)
-    written = []
-    for fnames, content in FILE_RE.findall(llm_text):
-        file_path = out_dir / fnames.strip()
-        file_path.parent.mkdir(parents=True, exist_ok=True)
-        file_path.write_text(content, encoding="utf-8")
-        written.append(file_path)
-    return written
\ No newline at end of file
+    writer = ArtifactWriter(out_dir)
+    writer.feed(llm_text)
+    return writer.close()
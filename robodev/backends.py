@@ -0,0 +1,155 @@
+import http.client
+import json
+import threading
+import time
+from typing import Iterable, List, Optional
+from robodev.transport import POOL
+
+DEFAULT_HOST = "http://localhost:11434"
+FAILURE_THRESHOLD = 3     # consecutive failures before a host's breaker opens
+COOLDOWN = 30.0           # seconds an open breaker rejects traffic (doubles on repeat trips)
+MAX_COOLDOWN = 300.0
+PROBE_INTERVAL = 30.0     # seconds between /api/tags health probes per host
+PROBE_TIMEOUT = 3.0
+# Network-level failures that make another host worth trying
+CONNECT_ERRORS = (OSError, http.client.HTTPException)
+
+
+class Backend:
+    def __init__(self, url: str, models: Iterable[str] = None):
+        self.url = url.rstrip("/")
+        # Configured models are authoritative; otherwise learn them from /api/tags
+        self.models = set(models or ())
+        self.probed_models = set()
+        self.outstanding = 0
+        self.latency_ms = None      # EWMA of completed request time
+        self.failures = 0
+        self.open_until = 0.0
+        self.cooldown = COOLDOWN
+        self.last_probe = 0.0
+        self._lock = threading.Lock()
+
+    def serves(self, model: str) -> bool:
+        known = self.models or self.probed_models
+        return not known or model in known
+
+    def available(self, now: float) -> bool:
+        # Closed, or open with the cooldown elapsed (half-open: let a trial through)
+        return self.open_until <= now
+
+    def begin(self):
+        with self._lock:
+            self.outstanding += 1
+
+    def end(self):
+        with self._lock:
+            self.outstanding -= 1
+
+    def succeeded(self, elapsed_ms: float):
+        with self._lock:
+            self.failures = 0
+            self.open_until = 0.0
+            self.cooldown = COOLDOWN
+            self.latency_ms = elapsed_ms if self.latency_ms is None else 0.8 * self.latency_ms + 0.2 * elapsed_ms
+
+    def failed(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= FAILURE_THRESHOLD or self.open_until:
+                # A failed half-open trial re-opens with a longer cooldown
+                if self.open_until:
+                    self.cooldown = min(self.cooldown * 2, MAX_COOLDOWN)
+                self.open_until = time.monotonic() + self.cooldown
+                print(f"⚠ Ollama host {self.url} unavailable, retrying in {self.cooldown:.0f}s")
+
+    def score(self) -> float:
+        # Latency-weighted least-outstanding: queue depth times typical request time
+        return (self.outstanding + 1) * (self.latency_ms or 1.0)
+
+
+class BackendPool:
+    def __init__(self, backends: List[Backend], probe_interval: float = PROBE_INTERVAL):
+        self.backends = backends
+        self.probe_interval = probe_interval
+        self._lock = threading.Lock()
+
+    def choose(self, model: str, exclude=()) -> Optional[Backend]:
+        now = time.monotonic()
+        self._maybe_probe(now)
+        serving = [b for b in self.backends if b not in exclude and b.serves(model)]
+        ready = [b for b in serving if b.available(now)]
+        if ready:
+            best = min(ready, key=Backend.score)
+        elif serving and not exclude:
+            # Every breaker is open: better to try the one closest to recovery than fail outright
+            best = min(serving, key=lambda b: b.open_until)
+        else:
+            return None
+        with best._lock:
+            if best.open_until:
+                # Half-open: this request is the single trial until it reports back
+                best.open_until = now + best.cooldown
+        return best
+
+    def healthy(self, model: str) -> bool:
+        # Whether a host serving the model can take it now without a recent failure;
+        # the router skips candidates that would only reach a failing host
+        now = time.monotonic()
+        return any(b.serves(model) and b.available(now) and not b.failures for b in self.backends)
+
+    def _maybe_probe(self, now: float):
+        if len(self.backends) < 2:
+            return
+        with self._lock:
+            due = [b for b in self.backends if now - b.last_probe >= self.probe_interval]
+            for b in due:
+                b.last_probe = now
+        for b in due:
+            threading.Thread(target=self.probe, args=(b,), daemon=True).start()
+
+    def probe(self, backend: Backend) -> bool:
+        try:
+            with POOL.request("GET", f"{backend.url}/api/tags", timeout=PROBE_TIMEOUT) as resp:
+                data = resp.read()
+                if resp.status >= 500:
+                    raise http.client.HTTPException(f"status {resp.status}")
+            models = {m.get("name") for m in json.loads(data).get("models", [])}
+        except (ValueError, *CONNECT_ERRORS):
+            backend.failed()
+            return False
+        backend.probed_models = {m for m in models if m} | {m.split(":")[0] for m in models if m}
+        if backend.open_until or backend.failures:
+            backend.succeeded(backend.latency_ms or 1.0)
+        return True
+
+    def status(self) -> List[dict]:
+        now = time.monotonic()
+        return [{
+            "url": b.url,
+            "models": sorted(b.models or b.probed_models),
+            "outstanding": b.outstanding,
+            "latency_ms": round(b.latency_ms, 1) if b.latency_ms is not None else None,
+            "open": not b.available(now),
+        } for b in self.backends]
+
+
+_POOLS = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def backend_pool(config: dict, host: str = None) -> BackendPool:
+    # One pool per distinct host list, shared by every client in the process so
+    # outstanding counts and breaker state see all traffic
+    if host:
+        hosts = [{"url": host}]
+    else:
+        hosts = config.get("hosts") or [{"url": config.get("host", DEFAULT_HOST)}]
+    hosts = [{"url": h} if isinstance(h, str) else h for h in hosts]
+    key = json.dumps(hosts, sort_keys=True)
+    with _POOLS_LOCK:
+        if key not in _POOLS:
+            _POOLS[key] = BackendPool(
+                [Backend(h["url"], h.get("models")) for h in hosts],
+                probe_interval=config.get("probe_interval", PROBE_INTERVAL),
+            )
+        return _POOLS[key]
@@ -0,0 +1,108 @@
+import hashlib
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Iterator, List
+from robodev.backends import CONNECT_ERRORS
+from robodev.llm_client import OllamaError
+
+TASKS = ("brainstorm", "codegen", "diagnose")
+DEFAULT_RETRIES = 2
+
+
+def job_id(job: dict) -> str:
+    # Explicit ids win; otherwise the job's own content names it, so reruns line up
+    if job.get("id"):
+        return str(job["id"])
+    blob = json.dumps(job, sort_keys=True)
+    return hashlib.sha1(blob.encode()).hexdigest()[:12]
+
+
+def load_jobs(path) -> List[dict]:
+    jobs = []
+    for n, line in enumerate(Path(path).read_text().splitlines(), 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        job = json.loads(line)
+        if job.get("task") not in TASKS:
+            raise ValueError(f"{path}:{n}: task must be one of {', '.join(TASKS)}")
+        job["id"] = job_id(job)
+        jobs.append(job)
+    return jobs
+
+
+def completed_ids(out_path: Path) -> set:
+    done = set()
+    if not out_path.exists():
+        return done
+    for line in out_path.read_text().splitlines():
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            continue  # torn last line from an interrupted run
+        if record.get("ok"):
+            done.add(record["id"])
+    return done
+
+
+def _retryable(e: Exception) -> bool:
+    # Transport failures and 5xx can pass; a 4xx (unknown model, bad request)
+    # or a missing log file will fail the same way every time
+    if isinstance(e, OllamaError):
+        return (e.status or 0) >= 500
+    if isinstance(e, FileNotFoundError):
+        return False
+    return isinstance(e, (*CONNECT_ERRORS, TimeoutError))
+
+
+def run_job(agent, job: dict) -> str:
+    task = job["task"]
+    if task == "brainstorm":
+        return agent.brainstorm(job["query"])
+    if task == "codegen":
+        out_dir = Path(job.get("out") or Path("./generated") / job["id"])
+        return agent.codegen(job["query"], lang=job.get("lang", "python"), xml=job.get("xml"), out_dir=out_dir)
+    from robodev.logreduce import reduce_log
+    if job.get("log"):
+        return agent.diagnose(reduce_log(job["log"]), refresh=job.get("refresh", False), reduced=True)
+    return agent.diagnose(job.get("log_text", ""), refresh=job.get("refresh", False))
+
+
+def _attempt(agent, job: dict, retries: int) -> dict:
+    start = time.monotonic()
+    error = ""
+    for attempt in range(1, retries + 2):
+        try:
+            output = run_job(agent, job)
+            return {"id": job["id"], "task": job["task"], "ok": True, "output": output,
+                    "attempts": attempt, "elapsed": round(time.monotonic() - start, 3)}
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            if not _retryable(e):
+                break
+            if attempt <= retries:
+                time.sleep(min(2 ** attempt, 30))
+    return {"id": job["id"], "task": job["task"], "ok": False, "error": error,
+            "attempts": attempt, "elapsed": round(time.monotonic() - start, 3)}
+
+
+def run_batch(agent, jobs: List[dict], out_path, workers: int, retries: int = DEFAULT_RETRIES) -> Iterator[dict]:
+    # Yields result records in completion order, appending each to out_path as
+    # it lands; jobs already recorded as ok in out_path are skipped
+    out_path = Path(out_path)
+    done = completed_ids(out_path)
+    pending = [j for j in jobs if j["id"] not in done]
+    if len(pending) < len(jobs):
+        print(f"⏭ Skipping {len(jobs) - len(pending)} jobs already in {out_path}")
+    if not pending:
+        return
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with out_path.open("a") as out, ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_attempt, agent, job, retries) for job in pending]
+        for future in as_completed(futures):
+            record = future.result()
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+            yield record
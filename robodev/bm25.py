@@ -0,0 +1,67 @@
+import math
+import re
+from collections import Counter
+from typing import Dict, List
+
+_WORD_RE = re.compile(r"[A-Za-z0-9]+")
+_CAMEL_RE = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in into is it its of on or that the their this
+to was we were which with our can using use based new via than these those also not but
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    # snake_case and camelCase split into their parts; plurals folded crudely
+    tokens = []
+    for word in _WORD_RE.findall(text or ""):
+        for part in _CAMEL_RE.split(word):
+            t = part.lower()
+            if len(t) < 2 or t in STOPWORDS:
+                continue
+            if len(t) > 3 and t.endswith("s") and not t.endswith("ss"):
+                t = t[:-1]
+            tokens.append(t)
+    return tokens
+
+
+class BM25:
+    def __init__(self, docs: List[List[str]], k1: float = 1.5, b: float = 0.75):
+        self._build([Counter(d) for d in docs], k1, b)
+
+    @classmethod
+    def from_counts(cls, counts: List[Dict[str, int]], k1: float = 1.5, b: float = 0.75) -> "BM25":
+        # Build from precomputed term-frequency maps (e.g. a persisted index)
+        bm25 = cls.__new__(cls)
+        bm25._build(counts, k1, b)
+        return bm25
+
+    def _build(self, counts: List[Dict[str, int]], k1: float, b: float):
+        self.k1 = k1
+        self.b = b
+        self.doc_lens = [sum(c.values()) for c in counts]
+        self.avgdl = (sum(self.doc_lens) / len(counts)) if counts else 0.0
+        # term -> {doc index: term frequency}
+        self.postings: Dict[str, Dict[int, int]] = {}
+        for i, doc in enumerate(counts):
+            for term, tf in doc.items():
+                self.postings.setdefault(term, {})[i] = tf
+
+    def idf(self, term: str) -> float:
+        n = len(self.doc_lens)
+        df = len(self.postings.get(term, ()))
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def scores(self, query: List[str]) -> List[float]:
+        out = [0.0] * len(self.doc_lens)
+        if not self.avgdl:
+            return out
+        for term in set(query):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf(term)
+            for i, tf in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lens[i] / self.avgdl)
+                out[i] += idf * tf * (self.k1 + 1) / (tf + norm)
+        return out
@@ -1,10 +1,30 @@
+# Startup stays cheap: each subcommand imports what it needs (the agent pulls
+# in the LLM client, asyncio, prompts and project indexing; digest pulls in
+# feedparser/requests), and `config`/`--help` touch none of it.
 import argparse
+import sys
+import time
 from pathlib import Path
-from robodev.agent import RoboDevAgent
-from robodev.memory import AgentMemory
+
+def _daemon_request(args) -> dict:
+    req = {"cmd": args.cmd, "stream": not args.no_stream, "cache": not args.no_cache, "session": args.session}
+    if args.cmd == "brainstorm":
+        req["query"] = args.query
+    elif args.cmd == "codegen":
+        # The daemon has its own cwd, so paths are resolved here
+        req.update(query=args.query, lang=args.lang, xml=args.xml, out=str(Path(args.out).resolve()))
+    elif args.cmd == "diagnose":
+        req.update(log=str(Path(args.log).resolve()), context=args.context, max_chars=args.max_chars, refresh=args.refresh)
+    elif args.cmd == "digest":
+        req.update(force=args.force, email=args.email)
+    return req
 
 def main():
     parser = argparse.ArgumentParser(prog="robodev", description="RoboDev CLI")
+    parser.add_argument("--no-stream", action="store_true", help="Wait for the full LLM response instead of streaming tokens")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the on-disk LLM response cache")
+    parser.add_argument("--session", default=None, help="Carry conversation history in the named session")
+    parser.add_argument("--no-daemon", action="store_true", help="Run in-process even if a robodev daemon is listening")
     sub = parser.add_subparsers(dest = "cmd", required=True)
     p1 = sub.add_parser("brainstorm", help="Brainstorm robotics approaches")
     p1.add_argument("query", type=str)
@@ -17,6 +37,9 @@ def main():
 
     p3 = sub.add_parser("diagnose", help="Analyze build/compile issues")
     p3.add_argument("--log", type=str)
+    p3.add_argument("--context", type=int, default=3, help="Lines of context kept around each error/warning")
+    p3.add_argument("--max-chars", type=int, default=12000, help="Character budget for the reduced log sent to the model")
+    p3.add_argument("--refresh", action="store_true", help="Ignore the stored diagnosis for a known failure and ask the model again")
 
     p4 = sub.add_parser("config", help="Set or View default (stack, sim, lang)")
     p4.add_argument("--set", nargs="*", help='key=value pairs, e.g., stack="ROS2" sim="Gazebo" lang="python"')
@@ -28,50 +51,139 @@ def main():
     p6.add_argument("--force", action="store_true", help="Force refresh of today's digest")
     p6.add_argument("--email", action="store_true", help="Send digest via email")
 
+    p7 = sub.add_parser("cache", help="Inspect or clear the LLM response cache")
+    p7.add_argument("action", choices=["stats", "clear"])
+
+    p8 = sub.add_parser("batch", help="Run brainstorm/codegen/diagnose jobs from a JSONL file in parallel")
+    p8.add_argument("jobs", type=str, help='JSONL, one job per line, e.g. {"id": "j1", "task": "brainstorm", "query": "..."}')
+    p8.add_argument("--out", default=None, type=str, help="Results JSONL (default: <jobs>.results.jsonl); completed jobs found here are skipped")
+    p8.add_argument("--workers", type=int, default=None, help="Concurrent jobs (default: max_parallel / OLLAMA_NUM_PARALLEL per host)")
+    p8.add_argument("--timeout", type=int, default=600, help="Per-request LLM timeout in seconds")
+    p8.add_argument("--retries", type=int, default=2, help="Retries per job on LLM/connection errors")
+
+    p9 = sub.add_parser("serve", help="Run a daemon that keeps caches and connections warm for later commands")
+    p9.add_argument("--socket", default=None, type=str, help="Unix socket path (default: ~/.robodev/robodev.sock)")
+
+    p10 = sub.add_parser("stats", help="Summarize recorded LLM and stage timings (p50/p95)")
+    p10.add_argument("--days", type=float, default=None, help="Only include the last N days")
+    p10.add_argument("--clear", action="store_true", help="Delete the metrics log")
+
     args = parser.parse_args()
-    mem = AgentMemory.load()
-    agent = RoboDevAgent(memory=mem)
 
     if args.cmd == "config":
-        if args.show:
-            print(mem.pretty())
-            return
+        from robodev.memory import AgentMemory
+        mem = AgentMemory.load()
         if args.set:
             for kv in args.set:
                 if "=" not in kv:
                     continue
                 key, value = kv.split("=")
-                mem.config[key.strip()] = value.strip().strip('"').strip("'")
+                mem.data[key.strip()] = value.strip().strip('"').strip("'")
             mem.save()
             print("updated configuration \n")
-            print(mem.pretty())
+        print(mem.pretty())
+        return
+
+    if args.cmd == "cache":
+        from robodev.config import load_config
+        from robodev.llm_cache import ResponseCache
+        cache = ResponseCache.from_config(load_config().get("cache", {}))
+        if args.action == "clear":
+            cache.clear()
+            print(f"Cleared LLM cache at {cache.path}")
             return
-        
-    if args.cmd == "brainstorm":
-        result = agent.brainstorm(args.query)
+        stats = cache.stats()
+        lookups = stats["hits"] + stats["misses"]
+        hit_rate = f"{100 * stats['hits'] / lookups:.1f}%" if lookups else "n/a"
+        print(f"LLM cache: {stats['path']}")
+        print(f"  entries: {stats['entries']}")
+        print(f"  size: {stats['bytes'] / 1024:.1f} KiB / {stats['max_bytes'] / 1024 / 1024:.0f} MiB")
+        print(f"  hits: {stats['hits']} | misses: {stats['misses']} | hit rate: {hit_rate}")
+        for task, count in sorted(stats["by_task"].items()):
+            print(f"  {task}: {count} entries")
+        return
+
+    if args.cmd == "stats":
+        from robodev import metrics
+        if args.clear:
+            metrics.METRICS_PATH.unlink(missing_ok=True)
+            print(f"Cleared metrics at {metrics.METRICS_PATH}")
+            return
+        since = time.time() - args.days * 86400 if args.days else None
+        print(metrics.summarize(metrics.load(since=since)))
+        return
+
+    if args.cmd == "serve":
+        from robodev.daemon import serve
+        serve(args.socket)
+        return
+
+    if args.cmd in ("brainstorm", "codegen", "diagnose", "digest") and not args.no_daemon:
+        from robodev.daemon import request
+        result = request(_daemon_request(args))
+        if result is not None:
+            if result:
+                print(result)
+            return
+
+    from robodev.memory import AgentMemory
+    mem = AgentMemory.load()
+
+    if args.cmd == "digest":
+        from robodev.daily_digest.relevant_feeds import build_digest
+        from robodev.llm_client import OllamaClient
+        result = build_digest(OllamaClient(cache=not args.no_cache), mem, force=args.force, email=args.email)
         print(result)
         return
+
+    from robodev.agent import RoboDevAgent
+    from robodev.llm_client import OllamaClient
+    from robodev.session import Session
+    session = Session.load(args.session) if args.session else None
+    agent = RoboDevAgent(memory=mem, llm=OllamaClient(cache=not args.no_cache), session=session)
+    stream = not args.no_stream
+
+    if args.cmd == "brainstorm":
+        result = agent.brainstorm(args.query, stream=stream)
+        if result:
+            print(result)
+        return
     
     if args.cmd == "codegen":
         out_dir = Path(args.out)
-        result = agent.codegen(args.query, lang=args.lang, xml=args.xml, out_dir=out_dir)
+        result = agent.codegen(args.query, lang=args.lang, xml=args.xml, out_dir=out_dir, stream=stream)
         print(result)
         return
     
     if args.cmd == "diagnose":
-        log_text = Path(args.log).read_text(encoding="utf-8", errors="ignore")
-        result = agent.diagnose(log_text)
-        print(result)
+        from robodev.logreduce import reduce_log
+        log_text = reduce_log(args.log, context=args.context, max_chars=args.max_chars)
+        result = agent.diagnose(log_text, stream=stream, refresh=args.refresh, reduced=True)
+        if result:
+            print(result)
         return
     
     if args.cmd == "i":
         agent.interactive()
         return
     
-    if args.cmd == "digest":
-        from robodev.daily_digest.relevant_feeds import build_digest
-        result = build_digest(agent.llm, mem, force=args.force, email=args.email)
-        print(result)
+    if args.cmd == "batch":
+        from robodev.batch import load_jobs, run_batch
+        jobs = load_jobs(args.jobs)
+        out = Path(args.out) if args.out else Path(args.jobs).with_suffix(".results.jsonl")
+        workers = args.workers or agent.allm.max_concurrency
+        agent.timeout = args.timeout
+        start = time.monotonic()
+        ok = failed = 0
+        for record in run_batch(agent, jobs, out, workers=workers, retries=args.retries):
+            status = "✅" if record["ok"] else f"❌ {record['error']}"
+            print(f"[{record['id']}] {record['task']} {record['elapsed']:.1f}s x{record['attempts']} {status}")
+            ok += record["ok"]
+            failed += not record["ok"]
+        print(f"📦 {ok} ok, {failed} failed in {time.monotonic() - start:.1f}s with {workers} workers → {out}")
+        # CI should see failed jobs
+        if failed:
+            sys.exit(1)
         return
 
 if __name__ == "__main__":
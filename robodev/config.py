@@ -0,0 +1,11 @@
+import json
+from pathlib import Path
+
+# Kept free of heavy imports: the CLI reads this before deciding what else to load
+CONFIG_PATH = Path.home() / ".robodev" / "llm_config.json"
+
+
+def load_config() -> dict:
+    if CONFIG_PATH.exists():
+        return json.loads(CONFIG_PATH.read_text())
+    return {}
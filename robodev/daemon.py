@@ -0,0 +1,166 @@
+import json
+import os
+import signal
+from contextlib import nullcontext
+import socket
+import socketserver
+import sys
+import threading
+from pathlib import Path
+from typing import Optional
+
+SOCKET_PATH = Path.home() / ".robodev" / "robodev.sock"
+COMMANDS = ("ping", "brainstorm", "codegen", "diagnose", "digest")
+
+
+def socket_path() -> Path:
+    from robodev.config import load_config
+    return Path(os.path.expanduser(load_config().get("socket", str(SOCKET_PATH))))
+
+
+class _ClientOut:
+    # File-like sink that forwards streamed tokens and agent notices to the client
+    def __init__(self, wfile):
+        self.wfile = wfile
+
+    def write(self, text: str):
+        if text:
+            _send(self.wfile, {"chunk": text})
+
+    def flush(self):
+        pass
+
+
+def _send(wfile, message: dict):
+    wfile.write((json.dumps(message) + "\n").encode())
+    wfile.flush()
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        try:
+            req = json.loads(self.rfile.readline())
+            _send(self.wfile, {"result": self.server.dispatch(req, _ClientOut(self.wfile))})
+        except BrokenPipeError:
+            pass  # client went away mid-stream
+        except Exception as e:
+            try:
+                _send(self.wfile, {"error": f"{type(e).__name__}: {e}"})
+            except OSError:
+                pass
+
+
+class RoboDevServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: Path):
+        from robodev.diagnosis_store import diagnosis_store
+        from robodev.llm_client import AsyncOllamaClient, OllamaClient
+        # Owner-only from the moment it exists: anyone who can connect can make
+        # the daemon read logs and write codegen output as this user
+        umask = os.umask(0o177)
+        try:
+            super().__init__(str(path), _Handler)
+        finally:
+            os.umask(umask)
+        # Warm state shared by every request: pooled connections, the response
+        # cache, stored diagnoses and (via module caches) project indexes
+        self.clients = {True: OllamaClient(cache=True), False: OllamaClient(cache=False)}
+        self.allms = {cache: AsyncOllamaClient(client) for cache, client in self.clients.items()}
+        diagnosis_store()
+        self._session_locks = {}
+        self._lock = threading.Lock()
+
+    def _agent(self, req: dict, out):
+        from robodev.agent import RoboDevAgent
+        from robodev.memory import AgentMemory
+        from robodev.session import Session
+        # Memory is tiny and may change under us via `robodev config --set`
+        session = Session.load(req["session"]) if req.get("session") else None
+        agent = RoboDevAgent(memory=AgentMemory.load(), llm=self.clients[req.get("cache", True)], session=session)
+        agent.out = out
+        return agent
+
+    def _session_lock(self, name) -> threading.Lock:
+        with self._lock:
+            return self._session_locks.setdefault(name, threading.Lock())
+
+    def dispatch(self, req: dict, out) -> str:
+        cmd = req.get("cmd")
+        if cmd not in COMMANDS:
+            raise ValueError(f"unknown command {cmd!r}")
+        if cmd == "ping":
+            return "pong"
+        if cmd == "digest":
+            from robodev.daily_digest.relevant_feeds import build_digest
+            from robodev.memory import AgentMemory
+            return build_digest(self.allms[req.get("cache", True)], AgentMemory.load(), force=req.get("force", False), email=req.get("email", False))
+        # Turns in one session must not interleave
+        with self._session_lock(req.get("session")) if req.get("session") else nullcontext():
+            agent = self._agent(req, out)
+            stream = req.get("stream", True)
+            if cmd == "brainstorm":
+                return agent.brainstorm(req["query"], stream=stream)
+            if cmd == "codegen":
+                return agent.codegen(req["query"], lang=req.get("lang", "python"), xml=req.get("xml"),
+                                     out_dir=Path(req.get("out", "./generated")), stream=stream)
+            from robodev.logreduce import reduce_log
+            log_text = reduce_log(req["log"], context=req.get("context", 3), max_chars=req.get("max_chars", 12000))
+            return agent.diagnose(log_text, stream=stream, refresh=req.get("refresh", False), reduced=True)
+
+
+def _alive(path: Path) -> bool:
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            s.connect(str(path))
+        return True
+    except OSError:
+        return False
+
+
+def serve(path: Path = None):
+    path = Path(path or socket_path())
+    if path.exists():
+        if _alive(path):
+            print(f"robodev daemon already running on {path}")
+            return
+        path.unlink()  # left behind by a daemon that didn't shut down cleanly
+    path.parent.mkdir(parents=True, exist_ok=True)
+    server = RoboDevServer(path)
+    # Service managers stop us with SIGTERM; unwind through the cleanup below
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    print(f"🛰 robodev daemon listening on {path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down.")
+    finally:
+        server.server_close()
+        path.unlink(missing_ok=True)
+
+
+def request(req: dict, path: Path = None, out=None) -> Optional[str]:
+    # Returns None when no daemon is listening so callers can run in-process
+    path = Path(path or socket_path())
+    if not path.exists():
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(path))
+    except OSError:
+        sock.close()
+        return None
+    out = out or sys.stdout
+    with sock, sock.makefile("rwb") as f:
+        f.write((json.dumps(req) + "\n").encode())
+        f.flush()
+        for line in f:
+            msg = json.loads(line)
+            if "chunk" in msg:
+                out.write(msg["chunk"])
+                out.flush()
+            elif "error" in msg:
+                raise RuntimeError(f"robodev daemon: {msg['error']}")
+            else:
+                return msg["result"]
+    raise RuntimeError("robodev daemon closed the connection mid-request")
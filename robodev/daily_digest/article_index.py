@@ -0,0 +1,115 @@
+import hashlib
+import re
+import sqlite3
+from contextlib import contextmanager
+from typing import Dict, Iterable, List
+from urllib.parse import parse_qsl, urlencode, urlsplit
+from robodev.daily_digest.feed_parser import CACHE_DIR, Article
+
+INDEX_PATH = CACHE_DIR / "articles.sqlite"
+
+ARXIV_RE = re.compile(r"arxiv\.org/(?:abs|pdf|html)/(\d{4}\.\d{4,5})(?:v\d+)?", re.IGNORECASE)
+TRACKING_PARAMS = ("utm_", "ref", "fbclid", "gclid")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    key TEXT PRIMARY KEY,
+    url TEXT,
+    title TEXT,
+    source TEXT,
+    first_seen TEXT NOT NULL,
+    profile TEXT,
+    score REAL,
+    scored_at TEXT,
+    summary TEXT,
+    category TEXT
+);
+CREATE INDEX IF NOT EXISTS articles_first_seen ON articles (first_seen);
+"""
+
+
+def normalize_url(url: str) -> str:
+    url = (url or "").strip()
+    if not url:
+        return ""
+    arxiv = ARXIV_RE.search(url)
+    if arxiv:
+        return f"arxiv:{arxiv.group(1)}"
+    parts = urlsplit(url)
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query)
+        if not k.lower().startswith(TRACKING_PARAMS)
+    ]
+    key = host + parts.path.rstrip("/")
+    if query:
+        key += "?" + urlencode(sorted(query))
+    return key
+
+
+def article_key(article: Article) -> str:
+    key = normalize_url(article.url)
+    if key:
+        return key
+    title = " ".join(article.title.lower().split())
+    return "title:" + hashlib.sha1(title.encode()).hexdigest()
+
+
+def profile_key(profile: dict) -> str:
+    # Scores are only reusable for the profile they were computed against
+    blob = "|".join(f"{k}={profile[k]}" for k in sorted(profile))
+    return hashlib.sha1(blob.encode()).hexdigest()[:12]
+
+
+class ArticleIndex:
+    def __init__(self, path=INDEX_PATH):
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as db:
+            db.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=10)
+        db.row_factory = sqlite3.Row
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def record_seen(self, articles: Iterable[Article], today: str):
+        rows = [(article_key(a), a.url, a.title.strip(), a.source, today) for a in articles]
+        with self._connect() as db:
+            db.executemany(
+                "INSERT OR IGNORE INTO articles (key, url, title, source, first_seen) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def lookup(self, keys: List[str]) -> Dict[str, sqlite3.Row]:
+        found = {}
+        with self._connect() as db:
+            # Stay well under SQLite's bound-parameter limit
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                marks = ",".join("?" * len(chunk))
+                for row in db.execute(f"SELECT * FROM articles WHERE key IN ({marks})", chunk):
+                    found[row["key"]] = row
+        return found
+
+    def record_scores(self, articles: Iterable[Article], profile: str, today: str):
+        rows = [(a.relevance_score, profile, today, article_key(a)) for a in articles]
+        with self._connect() as db:
+            # A new score invalidates any summary written under an older profile
+            db.executemany(
+                "UPDATE articles SET score = ?, profile = ?, scored_at = ?, summary = NULL, category = NULL "
+                "WHERE key = ?",
+                rows,
+            )
+
+    def record_summaries(self, summaries: Dict[str, dict]):
+        rows = [(s.get("summary", ""), s.get("category", ""), key) for key, s in summaries.items()]
+        with self._connect() as db:
+            db.executemany("UPDATE articles SET summary = ?, category = ? WHERE key = ?", rows)
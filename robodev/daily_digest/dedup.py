@@ -0,0 +1,99 @@
+import random
+import re
+import zlib
+from typing import Dict, List
+from robodev.daily_digest.article_index import article_key
+from robodev.daily_digest.feed_parser import Article
+
+NUM_PERM = 48
+BANDS = 16                     # 16 bands x 3 rows: ~98% recall for pairs at 0.6 Jaccard
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+SIMILARITY_THRESHOLD = 0.6
+_PRIME = (1 << 61) - 1
+
+_rng = random.Random(1729)
+_PERMS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+_TAG_RE = re.compile(r"<[^>]+>")
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def _shingles(article: Article) -> set:
+    text = _TAG_RE.sub(" ", f"{article.title} {article.summary}").lower()
+    words = _WORD_RE.findall(text)
+    if len(words) < SHINGLE_SIZE:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def _minhash(shingles: set) -> tuple:
+    hashes = [zlib.crc32(s.encode()) for s in shingles]
+    return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMS)
+
+
+def _similarity(sig_a: tuple, sig_b: tuple) -> float:
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / NUM_PERM
+
+
+class _UnionFind:
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i: int, j: int):
+        ri, rj = self.find(i), self.find(j)
+        if ri != rj:
+            # Keep the earlier article as the root so feed order decides the canonical copy
+            self.parent[max(ri, rj)] = min(ri, rj)
+
+
+def dedupe_articles(articles: List[Article], threshold: float = SIMILARITY_THRESHOLD) -> List[Article]:
+    uf = _UnionFind(len(articles))
+
+    # Exact matches: same normalized URL or arXiv ID
+    by_key: Dict[str, int] = {}
+    for i, a in enumerate(articles):
+        key = article_key(a)
+        if key in by_key:
+            uf.union(by_key[key], i)
+        else:
+            by_key[key] = i
+
+    # Near duplicates: MinHash + LSH banding, so only bucket-mates are compared
+    signatures = [_minhash(sh) if sh else None for sh in map(_shingles, articles)]
+    buckets: Dict[tuple, List[int]] = {}
+    for i, sig in enumerate(signatures):
+        if sig is None:
+            continue
+        for band in range(BANDS):
+            buckets.setdefault((band, sig[band * ROWS:(band + 1) * ROWS]), []).append(i)
+    for members in buckets.values():
+        first = members[0]
+        for other in members[1:]:
+            if uf.find(first) != uf.find(other) and _similarity(signatures[first], signatures[other]) >= threshold:
+                uf.union(first, other)
+
+    groups: Dict[int, List[int]] = {}
+    for i in range(len(articles)):
+        groups.setdefault(uf.find(i), []).append(i)
+
+    deduped = []
+    for root, members in sorted(groups.items()):
+        canonical = articles[root]
+        sources = []
+        for i in members:
+            dup = articles[i]
+            for source in dup.sources or [dup.source]:
+                if source not in sources:
+                    sources.append(source)
+            canonical.is_new = canonical.is_new or dup.is_new
+            if len(dup.summary) > len(canonical.summary):
+                canonical.summary = dup.summary
+        canonical.sources = sources
+        deduped.append(canonical)
+    return deduped
@@ -1,12 +1,24 @@
 import feedparser
+import hashlib
+import queue
 import requests
+import socket
+import threading
 import time
-from dataclasses import dataclass, field
-from typing import List, Optional
+from dataclasses import asdict, dataclass, field
+from typing import List, Optional, Tuple
 from pathlib import Path
 import json
 
+from robodev.project import atomic_write_bytes, atomic_write_text
+
 CACHE_DIR = Path.home() / ".robodev" / "news"
+FEED_CACHE_DIR = CACHE_DIR / "feeds"
+FEED_TIMEOUT = 15      # seconds allowed per feed download
+FETCH_DEADLINE = 30    # seconds allowed for the whole fetch stage
+MAX_WORKERS = 8
+CHUNK_SIZE = 8 * 1024
+USER_AGENT = "robodev-digest/0.1"
 
 # Curated RSS feeds for robotics + AI
 DEFAULT_FEEDS = [
@@ -32,27 +44,195 @@ class Article:
     source: str
     summary: str = ""
     published: str = ""
-    relevance_score: float = 0.0
+    relevance_score: float = 0.0      # LLM relevance, 0-10
+    prerank_score: float = 0.0        # BM25 keyword relevance, 0-10; only ranks candidates
+    is_new: bool = True    # not present in this feed's previous snapshot
+    sources: List[str] = field(default_factory=list)   # every feed carrying this story
 
 
-def fetch_feeds(feeds: Optional[List[str]] = None, max_per_feed: int = 15) -> List[Article]:
-    feeds = feeds or DEFAULT_FEEDS
-    articles = []
-    for feed_url in feeds:
+@dataclass
+class FeedResult:
+    url: str
+    source: str = ""
+    articles: List[Article] = field(default_factory=list)
+    elapsed: float = 0.0
+    error: str = ""
+    not_modified: bool = False
+
+    @property
+    def new_count(self) -> int:
+        return sum(1 for a in self.articles if a.is_new)
+
+
+def _feed_cache_paths(feed_url: str) -> Tuple[Path, Path]:
+    FEED_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    key = hashlib.sha1(feed_url.encode()).hexdigest()[:16]
+    return FEED_CACHE_DIR / f"{key}.json", FEED_CACHE_DIR / f"{key}.xml"
+
+
+def _load_feed_cache(feed_url: str) -> dict:
+    meta_path, _ = _feed_cache_paths(feed_url)
+    if meta_path.exists():
         try:
-            d = feedparser.parse(feed_url)
-            source = d.feed.get("title", feed_url)
+            return json.loads(meta_path.read_text())
+        except json.JSONDecodeError:
+            pass
+    return {}
+
+
+def _save_feed_cache(feed_url: str, headers, raw: bytes, source: str, articles: List[Article]):
+    meta_path, raw_path = _feed_cache_paths(feed_url)
+    meta = {
+        "url": feed_url,
+        "etag": headers.get("ETag"),
+        "last_modified": headers.get("Last-Modified"),
+        "source": source,
+        "fetched_at": time.time(),
+        "entries": [asdict(a) for a in articles],
+    }
+    # Write-then-rename so a crashed run never leaves a torn snapshot
+    atomic_write_bytes(raw_path, raw)
+    atomic_write_text(meta_path, json.dumps(meta))
+
+
+def _abort(resp):
+    # Closing a socket doesn't wake a thread blocked in recv(); shutting it down does
+    sock = getattr(getattr(resp.raw, "_connection", None), "sock", None)
+    if sock is None:
+        # Connection: close responses hand the socket to http.client's reader
+        sock = getattr(getattr(getattr(getattr(resp.raw, "_fp", None), "fp", None), "raw", None), "_sock", None)
+    if sock is not None:
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+def _download(feed_url: str, timeout: float, cached: dict, end: float = None):
+    headers = {"User-Agent": USER_AGENT}
+    if cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+    if cached.get("last_modified"):
+        headers["If-Modified-Since"] = cached["last_modified"]
+
+    # requests' timeout is per socket read, so a feed trickling bytes never
+    # trips it: cut the connection once the feed's time (or the whole fetch
+    # stage's) is up
+    start = time.monotonic()
+    limit = start + timeout
+    if end is not None:
+        limit = min(limit, end)
+    expired = threading.Event()
+    with requests.get(feed_url, timeout=max(limit - time.monotonic(), 0.1), stream=True, headers=headers) as resp:
+        if resp.status_code == 304:
+            return 304, b"", resp.headers
+        resp.raise_for_status()
+
+        def expire():
+            expired.set()
+            _abort(resp)
+
+        timer = threading.Timer(max(limit - time.monotonic(), 0.0), expire)
+        timer.daemon = True
+        timer.start()
+        chunks = []
+        try:
+            for chunk in resp.iter_content(chunk_size=CHUNK_SIZE):
+                chunks.append(chunk)
+                if expired.is_set():
+                    break
+        except Exception:
+            if not expired.is_set():
+                raise
+        finally:
+            timer.cancel()
+        # A cut connection can also read as a clean (truncated) end of body
+        if expired.is_set():
+            raise TimeoutError(f"download cut off after {time.monotonic() - start:.1f}s")
+    return resp.status_code, b"".join(chunks), resp.headers
+
+
+def _fetch_one(feed_url: str, max_per_feed: int, timeout: float, end: float = None) -> FeedResult:
+    start = time.monotonic()
+    result = FeedResult(url=feed_url, source=feed_url)
+    try:
+        cached = _load_feed_cache(feed_url)
+        status, raw, headers = _download(feed_url, timeout, cached, end)
+        if status == 304 and cached.get("entries") is not None:
+            # Unchanged since last run: reuse the parsed snapshot, nothing is new
+            result.not_modified = True
+            result.source = cached.get("source", feed_url)
+            result.articles = [Article(**dict(e, is_new=False)) for e in cached["entries"][:max_per_feed]]
+        else:
+            d = feedparser.parse(raw)
+            result.source = d.feed.get("title", feed_url)
+            seen = {e.get("url") for e in cached.get("entries", [])}
             for entry in d.entries[:max_per_feed]:
-                articles.append(Article(
+                url = entry.get("link", "")
+                result.articles.append(Article(
                     title=entry.get("title", ""),
-                    url=entry.get("link", ""),
-                    source=source,
+                    url=url,
+                    source=result.source,
                     summary=entry.get("summary", "")[:500],
                     published=entry.get("published", ""),
+                    is_new=url not in seen,
                 ))
-        except Exception as e:
-            print(f"⚠ Failed to fetch {feed_url}: {e}")
-    return articles
+            _save_feed_cache(feed_url, headers, raw, result.source, result.articles)
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+    result.elapsed = time.monotonic() - start
+    return result
+
+
+def fetch_all(feeds: Optional[List[str]] = None, max_per_feed: int = 15,
+              timeout: float = FEED_TIMEOUT, deadline: float = FETCH_DEADLINE) -> List[FeedResult]:
+    feeds = feeds or DEFAULT_FEEDS
+    end = time.monotonic() + deadline
+    pending = queue.SimpleQueue()
+    for i, url in enumerate(feeds):
+        pending.put((i, url))
+    results = {}
+    done = threading.Condition()
+
+    def worker():
+        while time.monotonic() < end:
+            try:
+                i, url = pending.get_nowait()
+            except queue.Empty:
+                return
+            result = _fetch_one(url, max_per_feed, timeout, end)
+            with done:
+                results[i] = result
+                done.notify()
+
+    # Daemon threads, not an executor: the interpreter joins executor workers
+    # at exit, so a straggler would hold the CLI past the deadline
+    for _ in range(min(MAX_WORKERS, len(feeds))):
+        threading.Thread(target=worker, daemon=True).start()
+    with done:
+        done.wait_for(lambda: len(results) == len(feeds), timeout=deadline)
+        finished = dict(results)
+    # Whatever finished in time is returned
+    return [
+        finished.get(i) or FeedResult(url=url, source=url, elapsed=deadline, error=f"timed out after {deadline}s")
+        for i, url in enumerate(feeds)
+    ]
+
+
+def fetch_feeds(feeds: Optional[List[str]] = None, max_per_feed: int = 15,
+                timeout: float = FEED_TIMEOUT, deadline: float = FETCH_DEADLINE) -> List[Article]:
+    start = time.monotonic()
+    results = fetch_all(feeds, max_per_feed=max_per_feed, timeout=timeout, deadline=deadline)
+    for r in results:
+        if r.error:
+            print(f"⚠ Failed to fetch {r.url}: {r.error} ({r.elapsed:.1f}s)")
+    ok = [r for r in results if not r.error]
+    unchanged = sum(1 for r in ok if r.not_modified)
+    new = sum(r.new_count for r in ok)
+    slowest = max(results, key=lambda r: r.elapsed)
+    print(f"📡 Feeds: {len(ok)}/{len(results)} ok ({unchanged} unchanged, {new} new articles) "
+          f"in {time.monotonic() - start:.1f}s (slowest: {slowest.source} {slowest.elapsed:.1f}s)")
+    return [a for r in results for a in r.articles]
 
 
 def _cache_path(date_str: str) -> Path:
@@ -1,33 +1,51 @@
+import asyncio
 from datetime import date
 from typing import List
+from robodev import metrics
+from robodev.bm25 import BM25, tokenize
+from robodev.llm_client import AsyncOllamaClient
 from robodev.daily_digest.feed_parser import Article, fetch_feeds, save_digest, load_digest
+from robodev.daily_digest.article_index import ArticleIndex, article_key, profile_key
+from robodev.daily_digest.dedup import dedupe_articles
 from robodev.daily_digest.send_mail import send_digest_email
 import json
 import re
 
-FILTER_PROMPT_TEMPLATE = """You are a robotics news curator for an engineer with this profile:
+SCORE_BATCH_SIZE = 15
+TOP_N = 10
+PRERANK_TOP_K = 45     # lexical pre-rank survivors sent on to LLM scoring
+DEFAULT_INTERESTS = "motion planning, control, perception, SLAM, manipulation, sim-to-real, Simulation"
+
+SCORE_PROMPT_TEMPLATE = """Rate each article 0-10 for relevance to a robotics engineer with this profile:
+- Stack: {stack}
+- Robot type: {robot_type}
+- Interests: {interests}
+
+Articles (id | title | abstract):
+{article_block}
+
+Output JSON only, one score per id:
+{{"scores": {{"<id>": N}}}}
+"""
+
+SUMMARY_PROMPT_TEMPLATE = """You are a robotics news curator for an engineer with this profile:
 - Stack: {stack}
 - Robot type: {robot_type}
 - Interests: {interests}
 
-Here are today's articles (title | source | abstract):
+These are today's most relevant articles (id | title | source | abstract):
 {article_block}
 
 Tasks:
-1. Score each article 0-10 for relevance to the engineer's profile.
-2. Pick the TOP 10 most relevant.
-3. For each, write a paragraph of actionable summary (what's new, why it matters, link to paper/code if mentioned).
-4. Group into categories: 🔬 Research, 🛠 Tools/Libraries, 📰 Industry News, 💡 Tutorials
+1. For each article, write a paragraph of actionable summary (what's new, why it matters, link to paper/code if mentioned).
+2. Assign each a category: 🔬 Research, 🛠 Tools/Libraries, 📰 Industry News, 💡 Tutorials
 
 Output JSON:
 {{
-  "date": "{today}",
   "highlights": [
     {{
-      "title": "...",
-      "url": "...",
+      "id": N,
       "category": "...",
-      "relevance": N,
       "summary": "..."
     }}
   ],
@@ -37,7 +55,13 @@ Output JSON:
 
 
 def build_digest(llm, memory, force: bool = False, email: bool = False) -> str:
+    with metrics.span("digest", force=force):
+        return _build_digest(llm, memory, force, email)
+
+
+def _build_digest(llm, memory, force: bool, email: bool) -> str:
     today = date.today().isoformat()
+    allm = llm if isinstance(llm, AsyncOllamaClient) else AsyncOllamaClient(llm)
 
     # Check cache
     if not force:
@@ -49,54 +73,216 @@ def build_digest(llm, memory, force: bool = False, email: bool = False) -> str:
             return result
 
     # Fetch
-    articles = fetch_feeds()
+    with metrics.span("digest.fetch") as sp:
+        articles = [a for a in fetch_feeds(memory.data.get("feeds")) if a.title.strip()]
+        sp.set(articles=len(articles))
     if not articles:
         return "No articles fetched today."
+    fetched = len(articles)
+    with metrics.span("digest.dedup"):
+        articles = dedupe_articles(articles)
+    if len(articles) < fetched:
+        print(f"🧹 Collapsed {fetched - len(articles)} duplicate articles ({fetched} → {len(articles)})")
 
-    # Limit to 20 articles max and truncate summaries
-    articles = articles[:20]
-    article_block = "\n".join(
-        f"- {a.title.strip()} | {a.source.strip()} | {a.summary[:100].strip()}"
-        for a in articles
-        if a.title.strip()
-    )
-
-    m = memory.data
-    prompt = FILTER_PROMPT_TEMPLATE.format(
-        stack=m.get("stack", "ROS2"),
-        robot_type=m.get("robot_type", "general"),
-        interests="motion planning, control, perception, SLAM, manipulation, sim-to-real, Simulation",
-        article_block=article_block,
-        today=today,
-    )
+    profile = _profile(memory)
+    profile_id = profile_key(profile)
+    with metrics.span("digest.prerank"):
+        _prerank(articles, profile)
+    with metrics.span("digest.index"):
+        index = ArticleIndex()
+        index.record_seen(articles, today)
+        known = index.lookup([article_key(a) for a in articles])
 
-    print(f"📡 Fetched {len(articles)} articles, prompt size: {len(prompt)} chars")
+    # Reuse LLM scores from earlier runs; of the rest, only the lexical
+    # top-K are worth an LLM call
+    ranked = sorted(articles, key=lambda a: a.prerank_score, reverse=True)
+    candidates, unscored = [], []
+    llm_scored = set()    # keys with a real LLM score; only these can make the digest
+    for rank, a in enumerate(ranked):
+        row = known.get(article_key(a))
+        if row is not None and row["score"] is not None and row["profile"] == profile_id:
+            a.relevance_score = row["score"]
+            candidates.append(a)
+            llm_scored.add(article_key(a))
+        elif rank < PRERANK_TOP_K:
+            candidates.append(a)
+            unscored.append(a)
+    print(f"📡 {len(articles)} articles, {len(candidates)} candidates ({len(unscored)} need LLM scoring)")
 
+    degraded = False
+    one_liner = ""
+    summaries = {}
+    top = None
     try:
-        raw = llm.chat(prompt, timeout=300, task="digest")
-    except Exception as e:
-        result = f"❌ LLM call failed: {e}"
-        if email:
-            _send_email(today, result)
-        return result
+        if unscored:
+            # Map: score new candidates in small batches, all batches in flight at once
+            with metrics.span("digest.score", articles=len(unscored)):
+                scored = _score_articles(allm, unscored, profile)
+            index.record_scores(scored, profile_id, today)
+            llm_scored.update(article_key(a) for a in scored)
+            known = index.lookup([article_key(a) for a in candidates])
+        # Articles from failed batches, or ones the model skipped, have no
+        # comparable score and stay out
+        rated = [a for a in candidates if article_key(a) in llm_scored]
+        if not rated:
+            raise RuntimeError("no article received an LLM score")
+        top = sorted(rated, key=lambda a: a.relevance_score, reverse=True)[:TOP_N]
 
-    try:
-        # Extract JSON from response (LLM sometimes wraps it in markdown)
-        json_match = re.search(r'\{[\s\S]*\}', raw)
-        if json_match:
-            digest = json.loads(json_match.group())
+        # Reduce: one summarization call over the winners that lack a summary
+        summaries = {
+            article_key(a): dict(known[article_key(a)])
+            for a in top
+            if known.get(article_key(a)) is not None and known[article_key(a)]["summary"]
+        }
+        pending = [a for a in top if article_key(a) not in summaries]
+        if pending:
+            with metrics.span("digest.summarize", articles=len(pending)):
+                raw = allm.client.chat(_summary_prompt(pending, profile), timeout=300, task="digest")
+                fresh, one_liner = _parse_summaries(pending, raw)
+            index.record_summaries(fresh)
+            summaries.update(fresh)
+    except Exception as e:
+        degraded = True
+        if top is None:
+            # Degrade to the local lexical ranking rather than returning nothing
+            print(f"⚠ LLM scoring failed, falling back to local ranking: {e}")
+            for a in articles:
+                a.relevance_score = a.prerank_score
+            top = sorted(articles, key=lambda a: a.relevance_score, reverse=True)[:TOP_N]
+            one_liner = "⚠ LLM unavailable — articles ranked locally by keyword relevance."
         else:
-            digest = json.loads(raw)
+            print(f"⚠ LLM summaries failed, keeping the LLM ranking: {e}")
+            one_liner = "⚠ Summaries unavailable — LLM-ranked articles shown with their feed abstracts."
+
+    if not one_liner:
+        previous = load_digest(today) or {}
+        one_liner = previous.get("one_liner") or f"Top story: {top[0].title.strip()}"
+
+    digest = _assemble_digest(today, top, summaries, one_liner, reviewed=len(articles))
+    if not degraded:
         save_digest(today, digest)
-        result = _format_digest(digest)
-    except (json.JSONDecodeError, AttributeError):
-        result = raw
+    result = _format_digest(digest)
 
     if email:
         _send_email(today, result)
 
     return result
 
+
+def _profile(memory) -> dict:
+    m = memory.data
+    return {
+        "stack": m.get("stack", "ROS2"),
+        "robot_type": m.get("robot_type", "general"),
+        "interests": m.get("interests") or DEFAULT_INTERESTS,
+    }
+
+
+def _prerank(articles: List[Article], profile: dict):
+    # BM25 of title+abstract against the profile, scaled to the LLM's 0-10 range
+    query = tokenize(" ".join(str(v) for v in profile.values()))
+    bm25 = BM25([tokenize(f"{a.title} {a.title} {a.summary}") for a in articles])
+    scores = bm25.scores(query)
+    best = max(scores, default=0.0) or 1.0
+    for a, score in zip(articles, scores):
+        a.prerank_score = round(10 * score / best, 2)
+
+
+def _extract_json(raw: str) -> dict:
+    # Extract JSON from response (LLM sometimes wraps it in markdown)
+    json_match = re.search(r'\{[\s\S]*\}', raw)
+    if json_match:
+        return json.loads(json_match.group())
+    return json.loads(raw)
+
+
+def _score_articles(allm, articles: List[Article], profile: dict) -> List[Article]:
+    batches = [articles[i:i + SCORE_BATCH_SIZE] for i in range(0, len(articles), SCORE_BATCH_SIZE)]
+    prompts = [
+        SCORE_PROMPT_TEMPLATE.format(
+            article_block="\n".join(
+                f"{i} | {a.title.strip()} | {a.summary[:200].strip()}"
+                for i, a in enumerate(batch)
+            ),
+            **profile,
+        )
+        for batch in batches
+    ]
+    print(f"🧮 Scoring {len(articles)} articles in {len(batches)} batches")
+    responses = asyncio.run(allm.gather_chat(prompts, timeout=300, task="digest", return_exceptions=True))
+
+    failures = 0
+    scored = []
+    for batch, raw in zip(batches, responses):
+        try:
+            if isinstance(raw, Exception):
+                raise raw
+            scores = _extract_json(raw).get("scores", {}).items()
+        except (json.JSONDecodeError, AttributeError, RuntimeError, OSError) as e:
+            print(f"⚠ Scoring batch failed: {e}")
+            failures += 1
+            continue
+        for key, score in scores:
+            try:
+                article = batch[int(key)]
+                article.relevance_score = float(score)
+            except (ValueError, TypeError, IndexError):
+                continue
+            scored.append(article)
+    if failures == len(batches):
+        raise RuntimeError("every scoring batch failed")
+    return scored
+
+
+def _summary_prompt(top: List[Article], profile: dict) -> str:
+    article_block = "\n".join(
+        f"{i} | {a.title.strip()} | {a.source.strip()} | {a.summary.strip()}"
+        for i, a in enumerate(top)
+    )
+    return SUMMARY_PROMPT_TEMPLATE.format(article_block=article_block, **profile)
+
+
+def _parse_summaries(pending: List[Article], raw: str):
+    try:
+        parsed = _extract_json(raw)
+        highlights = parsed.get("highlights", [])
+        one_liner = parsed.get("one_liner", "")
+    except (json.JSONDecodeError, AttributeError):
+        print("⚠ Could not parse summaries from LLM response")
+        return {}, ""
+    summaries = {}
+    for h in highlights:
+        try:
+            article = pending[int(h.get("id"))]
+        except (ValueError, TypeError, IndexError, AttributeError):
+            continue
+        summaries[article_key(article)] = {
+            "summary": h.get("summary", ""),
+            "category": h.get("category", ""),
+        }
+    return summaries, one_liner
+
+
+def _assemble_digest(today: str, top: List[Article], summaries: dict, one_liner: str, reviewed: int) -> dict:
+    highlights = []
+    for a in top:
+        s = summaries.get(article_key(a), {})
+        highlights.append({
+            "title": a.title.strip(),
+            "url": a.url,
+            "category": s.get("category") or "",
+            "relevance": round(a.relevance_score),
+            "summary": s.get("summary") or a.summary.strip(),
+            "sources": a.sources or [a.source],
+        })
+    return {
+        "date": today,
+        "highlights": highlights,
+        "one_liner": one_liner,
+        "reviewed": reviewed,
+    }
+
+
 def _send_email(today: str, body: str):
     print(f"📧 Attempting to send email... (body length: {len(body)} chars)")
     try:
@@ -148,9 +334,11 @@ def _format_digest(digest: dict) -> str:
             else:
                 lines.append(f"### {title}")
             lines.append(f"**Relevance: {relevance}/10**")
+            if len(h.get("sources", [])) > 1:
+                lines.append(f"_Sources: {', '.join(h['sources'])}_")
             lines.append(f"{summary}")
             lines.append("")
 
     lines.append("---")
-    lines.append(f"_Total articles reviewed: {len(digest.get('highlights', []))}_")
+    lines.append(f"_Total articles reviewed: {digest.get('reviewed', len(digest.get('highlights', [])))}_")
     return "\n".join(lines)
\ No newline at end of file
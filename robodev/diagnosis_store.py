@@ -0,0 +1,89 @@
+import atexit
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+from robodev.logreduce import error_signatures
+from robodev.project import atomic_write_text
+
+STORE_PATH = Path.home() / ".robodev" / "diagnoses.json"
+MAX_ENTRIES = 500
+HIT_FLUSH_SECONDS = 60.0   # hit counters are written at most this often (and at exit)
+
+
+def log_signature(log_text: str) -> Optional[str]:
+    sigs = error_signatures(log_text)
+    if not sigs:
+        return None
+    # Order-insensitive: parallel builds interleave the same errors differently
+    return hashlib.sha256("\n".join(sorted(sigs)).encode()).hexdigest()[:16]
+
+
+class DiagnosisStore:
+    def __init__(self, path: Path = STORE_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._saved_at = time.monotonic()
+        self.entries = {}
+        if self.path.exists():
+            try:
+                self.entries = json.loads(self.path.read_text())
+            except json.JSONDecodeError:
+                self.entries = {}
+
+    # Batch mode and the daemon diagnose from several threads at once, so
+    # every change and the save that follows it happen under the lock
+    def get(self, sig: str) -> Optional[dict]:
+        with self._lock:
+            entry = self.entries.get(sig)
+            if entry is None:
+                return None
+            entry["hits"] = entry.get("hits", 0) + 1
+            entry["last_hit"] = time.time()
+            # A hit is the fast path: don't rewrite the whole store for a counter
+            self._dirty = True
+            if time.monotonic() - self._saved_at > HIT_FLUSH_SECONDS:
+                self._save()
+            return dict(entry)
+
+    def put(self, sig: str, diagnosis: str, key_lines: list):
+        with self._lock:
+            self.entries[sig] = {
+                "diagnosis": diagnosis,
+                "key_lines": key_lines,
+                "created": time.time(),
+                "hits": 0,
+            }
+            if len(self.entries) > MAX_ENTRIES:
+                oldest = sorted(self.entries, key=lambda k: self.entries[k].get("last_hit", self.entries[k]["created"]))
+                for key in oldest[:len(self.entries) - MAX_ENTRIES]:
+                    del self.entries[key]
+            self._save()
+
+    def flush(self):
+        with self._lock:
+            if self._dirty:
+                self._save()
+
+    def _save(self):
+        atomic_write_text(self.path, json.dumps(self.entries, indent=2))
+        self._dirty = False
+        self._saved_at = time.monotonic()
+
+
+_STORE = None
+_STORE_LOCK = threading.Lock()
+
+
+def diagnosis_store() -> DiagnosisStore:
+    # One store per process, loaded on first use; pending hit counts are
+    # written when the process exits
+    global _STORE
+    with _STORE_LOCK:
+        if _STORE is None:
+            _STORE = DiagnosisStore()
+            atexit.register(_STORE.flush)
+        return _STORE
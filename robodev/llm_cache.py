@@ -0,0 +1,148 @@
+import hashlib
+import json
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+CACHE_PATH = Path.home() / ".robodev" / "llm_cache.sqlite"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_TTL = 24 * 3600
+# Seconds a response stays valid per task; 0 disables caching for that task
+DEFAULT_TTLS = {
+    "brainstorm": 7 * 24 * 3600,
+    "codegen": 24 * 3600,
+    "diagnose": 24 * 3600,
+    "digest": 0,
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    task TEXT,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL,
+    size INTEGER NOT NULL,
+    response TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+def cache_key(model: str, messages: list, options: dict = None) -> str:
+    normalized = [
+        {"role": m.get("role", "user").strip().lower(), "content": m.get("content", "").strip()}
+        for m in messages
+    ]
+    blob = json.dumps(
+        {"model": model, "messages": normalized, "options": options or {}},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, path: Path = CACHE_PATH, max_bytes: int = DEFAULT_MAX_BYTES, ttls: dict = None):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.hits = 0
+        self.misses = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as db:
+            db.executescript(SCHEMA)
+
+    @classmethod
+    def from_config(cls, config: dict) -> "ResponseCache":
+        return cls(
+            max_bytes=config.get("max_bytes", DEFAULT_MAX_BYTES),
+            ttls=config.get("ttl"),
+        )
+
+    @contextmanager
+    def _connect(self):
+        # One short-lived connection per operation keeps this usable from threads
+        db = sqlite3.connect(self.path, timeout=10)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def ttl_for(self, task: str = None) -> int:
+        return self.ttls.get(task or "default", DEFAULT_TTL)
+
+    def _count(self, db, name: str):
+        db.execute(
+            "INSERT INTO counters (name, value) VALUES (?, 1) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + 1",
+            (name,),
+        )
+
+    def get(self, key: str, task: str = None) -> Optional[str]:
+        now = time.time()
+        with self._connect() as db:
+            row = db.execute("SELECT created, response FROM entries WHERE key = ?", (key,)).fetchone()
+            if row and now - row[0] <= self.ttl_for(task):
+                db.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+                self._count(db, "hits")
+                self.hits += 1
+                return row[1]
+            if row:
+                db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._count(db, "misses")
+            self.misses += 1
+        return None
+
+    def put(self, key: str, task: str, response: str):
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO entries (key, task, created, accessed, size, response) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, task, now, now, size, response),
+            )
+            self._evict(db)
+
+    def _evict(self, db):
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in db.execute("SELECT key, size FROM entries ORDER BY accessed").fetchall():
+            db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def stats(self) -> dict:
+        with self._connect() as db:
+            entries, size = db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+            counters = dict(db.execute("SELECT name, value FROM counters").fetchall())
+            by_task = dict(db.execute("SELECT COALESCE(task, 'default'), COUNT(*) FROM entries GROUP BY task").fetchall())
+        return {
+            "path": str(self.path),
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "by_task": by_task,
+            "hits": counters.get("hits", 0),
+            "misses": counters.get("misses", 0),
+            "session_hits": self.hits,
+            "session_misses": self.misses,
+        }
+
+    def clear(self):
+        with self._connect() as db:
+            db.execute("DELETE FROM entries")
+            db.execute("DELETE FROM counters")
+        with self._connect() as db:
+            db.execute("VACUUM")
@@ -1,58 +1,284 @@
+import asyncio
 import json
-import urllib.request
-import urllib.error
-from pathlib import Path
+import os
+import time
+from contextlib import ExitStack, contextmanager
+from typing import Iterator, List
+from robodev import metrics
+from robodev.backends import CONNECT_ERRORS, backend_pool
+from robodev.config import load_config as _load_config
+from robodev.llm_cache import ResponseCache, cache_key
+from robodev.routing import router_for
+from robodev.transport import POOL
 
 DEFAULT_MODEL = "qwen2.5:14b"
-CONFIG_PATH = Path.home() / ".robodev" / "llm_config.json"
+DEFAULT_KEEP_ALIVE = "30m"
+DEFAULT_MAX_PARALLEL = 4
 
 
-def _load_config() -> dict:
-    if CONFIG_PATH.exists():
-        return json.loads(CONFIG_PATH.read_text())
-    return {}
+class OllamaError(RuntimeError):
+    # An error reported by Ollama itself; status is the HTTP status when there is one
+    def __init__(self, message: str, status: int = None):
+        super().__init__(message)
+        self.status = status
 
 
 class OllamaClient:
-    def __init__(self, model: str = None, host: str = None):
+    def __init__(self, model: str = None, host: str = None, cache: bool = None):
         config = _load_config()
         self.default_model = model or config.get("default", DEFAULT_MODEL)
         self.task_models = config.get("tasks", {})
-        self.host = (host or config.get("host", "http://localhost:11434")).rstrip("/")
+        # Optional per-task model choice by prompt size, latency history and SLO
+        self.router = router_for(config.get("routing", {}))
+        # One or more Ollama hosts (config "hosts": [{"url", "models"}]); requests
+        # go to the least-loaded host serving the model and fail over on errors
+        self.backends = backend_pool(config, host)
+        self.host = self.backends.backends[0].url
+        # How long Ollama keeps the model in VRAM after a call (null = server default)
+        self.keep_alive = config.get("keep_alive", DEFAULT_KEEP_ALIVE)
+        self.pool = POOL
+        # Opt-in: sessions continue from Ollama's returned KV context instead of resending history
+        self.carry_context = config.get("carry_context", False)
+        self.context_tokens = config.get("context_tokens", 8192)
+        cache_config = config.get("cache", {})
+        if cache is None:
+            cache = cache_config.get("enabled", True)
+        self.cache = ResponseCache.from_config(cache_config) if cache else None
 
     def _get_model(self, task: str = None) -> str:
         if task and task in self.task_models:
             return self.task_models[task]
         return self.default_model
 
-    def chat(self, prompt, timeout: int = 600, task: str = None) -> str:
-        model = self._get_model(task)
+    def _routed(self, task: str) -> bool:
+        return bool(task) and self.router.handles(task)
+
+    def _route(self, task: str, messages: list) -> str:
+        if self._routed(task):
+            return self.router.choose(task, messages, healthy=self.backends.healthy)
+        return self._get_model(task)
+
+    def _reroute(self, task: str, messages: list):
+        # Fallback for _post when a routed model's hosts all fail
+        if self._routed(task):
+            return lambda: self._route(task, messages)
+        return None
 
+    def _messages(self, prompt) -> list:
         # Handle both string and messages list
         if isinstance(prompt, str):
-            messages = [{"role": "user", "content": prompt}]
-        elif isinstance(prompt, list):
-            messages = prompt
-        else:
-            raise ValueError(f"prompt must be str or list, got {type(prompt)}")
-
-        payload = json.dumps({
-            "model": model,
-            "messages": messages,
-            "stream": False,
-        }).encode()
-        req = urllib.request.Request(
-            f"{self.host}/api/chat",
-            data=payload,
-            headers={"Content-Type": "application/json"},
+            return [{"role": "user", "content": prompt}]
+        if isinstance(prompt, list):
+            return prompt
+        raise ValueError(f"prompt must be str or list, got {type(prompt)}")
+
+    @contextmanager
+    def _post(self, endpoint: str, payload: dict, timeout: int, reroute=None):
+        # Yields (response, backend, model). Connection errors and 5xx before
+        # any output move on to the next host; errors mid-stream are not
+        # retried. Once every host for a routed model has failed, reroute()
+        # picks the next candidate (the failed hosts no longer count as healthy).
+        model = payload["model"]
+        if self.keep_alive is not None:
+            payload = dict(payload, keep_alive=self.keep_alive)
+        body = json.dumps(payload).encode()
+        tried, error, models = [], None, [model]
+        while True:
+            backend = self.backends.choose(model, exclude=tried)
+            if backend is None:
+                nxt = reroute() if reroute and error else None
+                if nxt is None or nxt in models:
+                    raise error or RuntimeError(f"No Ollama host available for model {model}")
+                print(f"⚠ {model} unreachable, routing to {nxt}")
+                model = nxt
+                models.append(model)
+                payload = dict(payload, model=model)
+                body = json.dumps(payload).encode()
+                tried = []
+                continue
+            tried.append(backend)
+            with ExitStack() as stack:
+                backend.begin()
+                stack.callback(backend.end)
+                start = time.perf_counter()
+                try:
+                    resp = stack.enter_context(self.pool.request(
+                        "POST",
+                        f"{backend.url}{endpoint}",
+                        body=body,
+                        headers={"Content-Type": "application/json"},
+                        timeout=timeout,
+                    ))
+                except CONNECT_ERRORS as e:
+                    backend.failed()
+                    error = e
+                    continue
+                if resp.status >= 500:
+                    error = OllamaError(f"Ollama API error {resp.status} from {backend.url} (model={model}): "
+                                        f"{resp.read().decode()}", resp.status)
+                    backend.failed()
+                    continue
+                try:
+                    yield resp, backend, model
+                except CONNECT_ERRORS:
+                    backend.failed()
+                    raise
+                backend.succeeded((time.perf_counter() - start) * 1000)
+                return
+
+    def _label(self, model: str, task: str, backend) -> str:
+        where = f" @ {backend.url}" if len(self.backends.backends) > 1 else ""
+        return f"🤖 Model: {model}{where} | Task: {task or 'default'}"
+
+    @staticmethod
+    def _check(resp, model: str):
+        if resp.status >= 400:
+            error_body = resp.read().decode()
+            raise OllamaError(
+                f"Ollama API error {resp.status} (model={model}): {error_body}", resp.status
+            )
+
+    def _cache_key(self, model: str, messages: list, task: str = None):
+        if self.cache is None or self.cache.ttl_for(task) <= 0:
+            return None
+        return cache_key(model, messages)
+
+    def chat(self, prompt, timeout: int = 600, task: str = None, refresh: bool = False) -> str:
+        # refresh=True skips the cached answer and overwrites it with the new one
+        start = time.perf_counter()
+        messages = self._messages(prompt)
+        model = self._route(task, messages)
+        key = self._cache_key(model, messages, task)
+        if key and not refresh:
+            cached = self.cache.get(key, task)
+            if cached is not None:
+                print(f"🤖 Model: {model} | Task: {task or 'default'} (cached)")
+                metrics.record_llm(task, model, "/api/chat", {}, (time.perf_counter() - start) * 1000, cached=True)
+                return cached
+
+        payload = {"model": model, "messages": messages, "stream": False}
+        with metrics.span("llm.http", task=task, model=model):
+            reroute = self._reroute(task, messages)
+            with self._post("/api/chat", payload, timeout=timeout, reroute=reroute) as (resp, backend, model):
+                self._check(resp, model)
+                body = resp.read()
+        with metrics.span("llm.parse", task=task, bytes=len(body)):
+            data = json.loads(body.decode())
+        metrics.record_llm(task, model, "/api/chat", data, (time.perf_counter() - start) * 1000, host=backend.url)
+        self.router.observe(task, model, data)
+        print(self._label(model, task, backend))
+        content = data["message"]["content"]
+        if key:
+            self.cache.put(self._cache_key(model, messages, task), task, content)
+        return content
+
+    def chat_stream(self, prompt, timeout: int = 600, task: str = None, refresh: bool = False) -> Iterator[str]:
+        messages = self._messages(prompt)
+        model = self._route(task, messages)
+        key = self._cache_key(model, messages, task)
+        if key and not refresh:
+            start = time.perf_counter()
+            cached = self.cache.get(key, task)
+            if cached is not None:
+                print(f"🤖 Model: {model} | Task: {task or 'default'} (cached)")
+                metrics.record_llm(task, model, "/api/chat", {}, (time.perf_counter() - start) * 1000, cached=True)
+                yield cached
+                return
+
+        parts, result = [], {}
+        payload = {"model": model, "messages": messages, "stream": True}
+        for content in self._stream("/api/chat", payload, timeout, task, result, self._reroute(task, messages)):
+            parts.append(content)
+            yield content
+        if key:
+            self.cache.put(self._cache_key(result.get("model", model), messages, task), task, "".join(parts))
+
+    def generate_stream(self, prompt: str, system: str = None, context: list = None,
+                        timeout: int = 600, task: str = None, result: dict = None) -> Iterator[str]:
+        # /api/generate continues from a previous call's returned `context`, so
+        # a session can skip re-prefilling everything it already sent. The
+        # final chunk (with "context") lands in `result`. Not cached: the
+        # continuation depends on the whole carried context. Not routed
+        # either: a context is only valid for the model that produced it.
+        model = self._get_model(task)
+        payload = {"model": model, "prompt": prompt, "stream": True}
+        if system is not None:
+            payload["system"] = system
+        if context:
+            payload["context"] = context
+        yield from self._stream("/api/generate", payload, timeout, task, result)
+
+    def _stream(self, endpoint: str, payload: dict, timeout: int, task: str = None,
+                result: dict = None, reroute=None) -> Iterator[str]:
+        # Yields content deltas as Ollama emits them (one JSON object per line)
+        start = time.perf_counter()
+        first = None
+        with self._post(endpoint, payload, timeout=timeout, reroute=reroute) as (resp, backend, model):
+            self._check(resp, model)
+            print(self._label(model, task, backend))
+            for line in resp:
+                line = line.strip()
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if "error" in chunk:
+                    raise OllamaError(f"Ollama API error (model={model}): {chunk['error']}")
+                # /api/chat streams message.content, /api/generate streams response
+                content = chunk.get("message", {}).get("content", "") or chunk.get("response", "")
+                if content:
+                    if first is None:
+                        first = time.perf_counter()
+                    yield content
+                if chunk.get("done"):
+                    now = time.perf_counter()
+                    ttft = ((first or now) - start) * 1000
+                    metrics.record_llm(task, model, endpoint, chunk, (now - start) * 1000, ttft_ms=ttft,
+                                       host=backend.url)
+                    self.router.observe(task, model, chunk)
+                    if result is not None:
+                        result.update(chunk, model=model)
+                    # Drain the terminating chunk so the connection can be reused
+                    resp.read()
+                    return
+
+
+class AsyncOllamaClient:
+    # asyncio front-end over OllamaClient: same task->model mapping, cache and
+    # connection pool, with blocking HTTP calls pushed onto worker threads.
+    def __init__(self, client: OllamaClient = None, max_concurrency: int = None):
+        self.client = client or OllamaClient()
+        # Each host runs its own OLLAMA_NUM_PARALLEL slots
+        self.max_concurrency = max_concurrency or _max_parallel(_load_config()) * len(self.client.backends.backends)
+        self._semaphore = None
+        self._loop = None
+
+    def _get_model(self, task: str = None) -> str:
+        return self.client._get_model(task)
+
+    def _limit(self) -> asyncio.Semaphore:
+        # Semaphores belong to one event loop; rebuild when asyncio.run starts a new one
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._semaphore
+
+    async def chat(self, prompt, timeout: int = 600, task: str = None) -> str:
+        async with self._limit():
+            return await asyncio.to_thread(self.client.chat, prompt, timeout, task)
+
+    async def gather_chat(self, prompts: list, timeout: int = 600, task: str = None,
+                          return_exceptions: bool = False) -> List[str]:
+        return await asyncio.gather(
+            *(self.chat(p, timeout=timeout, task=task) for p in prompts),
+            return_exceptions=return_exceptions,
         )
-        try:
-            with urllib.request.urlopen(req, timeout=timeout) as resp:
-                data = json.loads(resp.read().decode())
-            print(f"🤖 Model: {model} | Task: {task or 'default'}")
-            return data["message"]["content"]
-        except urllib.error.HTTPError as e:
-            error_body = e.read().decode()
-            raise RuntimeError(
-                f"Ollama API error {e.code} (model={model}): {error_body}"
-            ) from e
\ No newline at end of file
+
+
+def _max_parallel(config: dict) -> int:
+    # Match the server's OLLAMA_NUM_PARALLEL unless llm_config.json overrides it
+    return (
+        config.get("max_parallel")
+        or int(os.environ.get("OLLAMA_NUM_PARALLEL", 0) or 0)
+        or DEFAULT_MAX_PARALLEL
+    )
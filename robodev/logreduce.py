@@ -0,0 +1,212 @@
+import re
+from collections import deque
+from pathlib import Path
+from typing import Iterable, List, Union
+
+DEFAULT_CONTEXT = 3
+DEFAULT_MAX_CHARS = 12000      # roughly 3k tokens at ~4 chars/token
+MAX_LINE_CHARS = 400
+TAIL_LINES = 30
+MAX_SIGNATURES = 20000         # bounds memory on logs with endless unique lines
+
+ANSI_RE = re.compile(r"\x1b\[[0-9;]*[A-Za-z]")
+ERROR_RE = re.compile(
+    r"\berror\b|\bfatal\b|undefined reference|multiple definition|CMake Error|"
+    r"ld returned|collect2:|No such file or directory|cannot find -l|Could not find a package|"
+    r"Could NOT find|Traceback \(most recent call last\)|\b[A-Z]\w*Error:|Failed\s+<<<|\*\*\* \[|"
+    r"ninja: build stopped|make(\[\d+\])?: \*\*\*",
+    re.IGNORECASE,
+)
+WARNING_RE = re.compile(r"\bwarning\b|CMake Warning|DeprecationWarning", re.IGNORECASE)
+# Template-instantiation and include-chain chatter: counted, never repeated
+NOISE_RE = re.compile(r"required from|In instantiation of|In file included from|^\s+from \S+:\d+|note:")
+# Cheap screen over the lowercased line so the regexes above only run on the
+# few lines that can match (a case-sensitive literal alternation is far
+# faster than IGNORECASE)
+SCREEN_RE = re.compile("|".join(re.escape(t) for t in (
+    "error", "fatal", "undefined reference", "multiple definition", "ld returned", "collect2",
+    "no such file", "cannot find", "could not find", "traceback", "failed", "***", "stopped",
+    "warning", "required from", "instantiation", "included from", "note:",
+)))
+
+_PATH_RE = re.compile(r"(?:[A-Za-z]:)?(?:[\w.\-+~]*/)+")
+_LOC_RE = re.compile(r":\d+(?::\d+)?")
+_HEX_RE = re.compile(r"0x[0-9a-fA-F]+")
+_NUM_RE = re.compile(r"\d+")
+_TEMPLATE_RE = re.compile(r"<[^<>]*>")
+
+
+def signature(line: str) -> str:
+    # Collapse everything that varies between otherwise-identical messages
+    s = ANSI_RE.sub("", line)
+    s = _PATH_RE.sub("", s)
+    s = _LOC_RE.sub(":N", s)
+    s = _HEX_RE.sub("HEX", s)
+    for _ in range(8):
+        collapsed = _TEMPLATE_RE.sub("<T>", s)
+        if collapsed == s:
+            break
+        s = collapsed
+    s = _NUM_RE.sub("N", s)
+    return " ".join(s.split())
+
+
+def _classify(line: str) -> str:
+    if not SCREEN_RE.search(line.lower()) and not line[:1].isspace():
+        return ""
+    if NOISE_RE.search(line):
+        return "noise"
+    if ERROR_RE.search(line):
+        return "error"
+    if WARNING_RE.search(line):
+        return "warning"
+    return ""
+
+
+def error_signatures(text: str, limit: int = 20) -> List[str]:
+    # Normalized key error lines, in first-seen order, for fingerprinting a failure
+    sigs = []
+    for line in text.splitlines():
+        if _classify(line) == "error":
+            sig = signature(line)
+            if sig not in sigs:
+                sigs.append(sig)
+                if len(sigs) >= limit:
+                    break
+    return sigs
+
+
+class LogReducer:
+    def __init__(self, context: int = DEFAULT_CONTEXT, max_chars: int = DEFAULT_MAX_CHARS):
+        self.context = context
+        self.max_chars = max_chars
+        self.before = deque(maxlen=context)
+        self.tail = deque(maxlen=TAIL_LINES)
+        self.counts = {}
+        self.blocks = {"error": [], "warning": []}
+        self.stored = {"error": 0, "warning": 0}
+        self.current = None
+        self.after = 0
+        self.lines = 0
+        self.chars = 0
+
+    def feed(self, raw: str):
+        line = raw.rstrip("\r\n")
+        if "\x1b" in line:
+            line = ANSI_RE.sub("", line)
+        if len(line) > MAX_LINE_CHARS:
+            line = line[:MAX_LINE_CHARS] + " …"
+        self.lines += 1
+        self.chars += len(raw)
+        self.tail.append(line)
+
+        kind = _classify(line)
+        if kind:
+            sig = signature(line)
+            seen = sig in self.counts
+            if seen or len(self.counts) < MAX_SIGNATURES:
+                self.counts[sig] = self.counts.get(sig, 0) + 1
+            if kind == "noise" or seen:
+                # Repeats only bump their counter; stale context is dropped
+                if self.after > 0 and not seen and self.current is not None:
+                    self.current["lines"].append(line)
+                    self.after -= 1
+                self.before.append(line)
+                return
+            self._open_block(kind, sig, line)
+        elif self.after > 0 and self.current is not None:
+            self.current["lines"].append(line)
+            self.after -= 1
+        self.before.append(line)
+
+    def _open_block(self, kind: str, sig: str, line: str):
+        self.current = None
+        self.after = 0
+        # Keep collecting only while there is a realistic chance the block makes the cut
+        if self.stored[kind] > self.max_chars:
+            return
+        block = {"kind": kind, "sig": sig, "lines": list(self.before) + [line]}
+        self.before.clear()
+        self.blocks[kind].append(block)
+        self.stored[kind] += sum(len(l) + 1 for l in block["lines"])
+        self.current = block
+        self.after = self.context
+
+    def render(self) -> str:
+        errors = sum(self.counts[b["sig"]] for b in self.blocks["error"])
+        warnings = sum(self.counts[b["sig"]] for b in self.blocks["warning"])
+        header = (
+            f"[Reduced log: {self.lines} lines, {self.chars / 1024:.0f} KiB; "
+            f"{len(self.blocks['error'])} unique errors ({errors} total), "
+            f"{len(self.blocks['warning'])} unique warnings ({warnings} total)]"
+        )
+        out: List[str] = [header]
+        budget = self.max_chars - len(header)
+
+        def add(section: str, blocks: list) -> int:
+            nonlocal budget
+            if not blocks:
+                return 0
+            title = f"\n== {section} =="
+            if len(title) > budget:
+                return len(blocks)
+            out.append(title)
+            budget -= len(title) + 1
+            for i, b in enumerate(blocks):
+                text = "\n".join(b["lines"])
+                repeats = self.counts.get(b["sig"], 1)
+                if repeats > 1:
+                    text += f"\n  (repeated {repeats}x)"
+                text += "\n--"
+                if len(text) + 1 > budget:
+                    return len(blocks) - i
+                out.append(text)
+                budget -= len(text) + 1
+            return 0
+
+        omitted = add("Errors", self.blocks["error"])
+        # The last lines usually hold the build tool's own failure summary;
+        # keep as many of them as the remaining budget allows
+        tail, room = [], budget - len("\n== Tail ==") - 4
+        for line in reversed(self.tail):
+            room -= len(line) + 1
+            if room < 0:
+                break
+            tail.insert(0, line)
+        if tail:
+            omitted += add("Tail", [{"sig": None, "lines": tail}])
+        elif self.tail:
+            omitted += 1
+        omitted += add("Warnings", self.blocks["warning"])
+        noise = sum(n for sig, n in self.counts.items() if n > 1)
+        if omitted:
+            out.append(f"[{omitted} more blocks omitted to fit {self.max_chars} chars]")
+        elif noise:
+            out.append(f"[{noise} repeated diagnostic lines collapsed]")
+        return "\n".join(out)
+
+
+def reduce_lines(lines: Iterable[Union[str, bytes]], context: int = DEFAULT_CONTEXT,
+                 max_chars: int = DEFAULT_MAX_CHARS) -> str:
+    reducer = LogReducer(context=context, max_chars=max_chars)
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8", errors="ignore")
+        reducer.feed(line)
+    return reducer.render()
+
+
+def reduce_log(path, context: int = DEFAULT_CONTEXT, max_chars: int = DEFAULT_MAX_CHARS) -> str:
+    path = Path(path)
+    if path.stat().st_size <= max_chars:
+        return path.read_text(encoding="utf-8", errors="ignore")
+    # Binary line iteration reads through a fixed-size buffer, so memory stays
+    # flat however large the log is
+    with path.open("rb") as f:
+        return reduce_lines(f, context=context, max_chars=max_chars)
+
+
+def reduce_log_text(text: str, context: int = DEFAULT_CONTEXT, max_chars: int = DEFAULT_MAX_CHARS) -> str:
+    if len(text) <= max_chars:
+        return text
+    return reduce_lines(text.splitlines(), context=context, max_chars=max_chars)
@@ -0,0 +1,207 @@
+import json
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from robodev.config import load_config
+
+METRICS_PATH = Path.home() / ".robodev" / "metrics.jsonl"
+# Timing fields Ollama returns on the final (done) response; durations are ns
+LLM_COUNTERS = ("total_duration", "load_duration", "prompt_eval_count",
+                "prompt_eval_duration", "eval_count", "eval_duration")
+# One id per process so spans from one command can be grouped
+TRACE_ID = uuid.uuid4().hex[:12]
+
+_enabled = None
+_lock = threading.Lock()
+_local = threading.local()
+
+
+def enabled() -> bool:
+    # Off by default; `"metrics": true` in llm_config.json or ROBODEV_METRICS=1
+    global _enabled
+    if _enabled is None:
+        env = os.environ.get("ROBODEV_METRICS")
+        if env is not None:
+            _enabled = env.lower() not in ("", "0", "false", "no")
+        else:
+            _enabled = bool(load_config().get("metrics", False))
+    return _enabled
+
+
+def set_enabled(on: bool):
+    global _enabled
+    _enabled = on
+
+
+def _emit(record: dict):
+    line = json.dumps(record) + "\n"
+    with _lock:
+        METRICS_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with METRICS_PATH.open("a") as f:
+            f.write(line)
+
+
+class _NoSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NOOP = _NoSpan()
+
+
+class _Span:
+    __slots__ = ("name", "attrs", "parent", "start")
+
+    def __init__(self, name: str, attrs: dict):
+        self.name = name
+        self.attrs = attrs
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        stack = _local.__dict__.setdefault("stack", [])
+        self.parent = stack[-1].name if stack else None
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        ms = (time.perf_counter() - self.start) * 1000
+        _local.stack.pop()
+        record = {"type": "span", "trace": TRACE_ID, "ts": round(time.time(), 3), "name": self.name,
+                  "parent": self.parent, "ms": round(ms, 3)}
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+        record.update(self.attrs)
+        _emit(record)
+        return False
+
+
+def span(name: str, **attrs):
+    # Disabled: a shared no-op, so instrumented code pays one function call
+    if not enabled():
+        return _NOOP
+    return _Span(name, attrs)
+
+
+def record_llm(task: str, model: str, endpoint: str, stats: dict, wall_ms: float,
+               ttft_ms: float = None, cached: bool = False, host: str = None):
+    if not enabled():
+        return
+    record = {"type": "llm", "trace": TRACE_ID, "ts": round(time.time(), 3), "task": task or "default",
+              "model": model, "endpoint": endpoint, "cached": cached, "wall_ms": round(wall_ms, 3)}
+    if host is not None:
+        record["host"] = host
+    if ttft_ms is not None:
+        record["ttft_ms"] = round(ttft_ms, 3)
+    for key in LLM_COUNTERS:
+        if key in stats:
+            record[key] = stats[key]
+    if stats.get("eval_duration"):
+        record["eval_tps"] = round(stats.get("eval_count", 0) / (stats["eval_duration"] / 1e9), 2)
+    if stats.get("prompt_eval_duration"):
+        record["prefill_tps"] = round(stats.get("prompt_eval_count", 0) / (stats["prompt_eval_duration"] / 1e9), 2)
+    _emit(record)
+
+
+def record_route(task: str, model: str, reason: str, prompt_tokens: int, slo_ms: float, estimates: dict):
+    if not enabled():
+        return
+    _emit({"type": "route", "trace": TRACE_ID, "ts": round(time.time(), 3), "task": task, "model": model,
+           "reason": reason, "prompt_tokens": prompt_tokens, "slo_ms": slo_ms, "estimates_ms": estimates})
+
+
+def load(path=None, since: float = None) -> list:
+    path = Path(path or METRICS_PATH)
+    if not path.exists():
+        return []
+    records = []
+    with path.open() as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if since is None or record.get("ts", 0) >= since:
+                records.append(record)
+    return records
+
+
+def percentile(values: list, p: float):
+    if not values:
+        return None
+    values = sorted(values)
+    k = (len(values) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+
+def _fmt(value, unit: str = "") -> str:
+    if value is None:
+        return "-"
+    return f"{value:.0f}{unit}" if value >= 100 else f"{value:.1f}{unit}"
+
+
+def _durations_ms(records: list, key: str) -> list:
+    # Ollama reports durations in nanoseconds
+    return [r[key] / 1e6 for r in records if r.get(key) is not None]
+
+
+def _p50_p95(values: list, unit: str = "ms") -> str:
+    return f"{_fmt(percentile(values, 50), unit)}/{_fmt(percentile(values, 95), unit)}"
+
+
+def summarize(records: list) -> str:
+    llm, spans, routes = {}, {}, {}
+    for r in records:
+        if r.get("type") == "llm":
+            llm.setdefault((r["task"], r["model"]), []).append(r)
+        elif r.get("type") == "route":
+            routes.setdefault((r["task"], r["model"], r["reason"]), []).append(r)
+        elif r.get("type") == "span":
+            spans.setdefault(r["name"], []).append(r)
+    if not llm and not spans and not routes:
+        return "No metrics recorded yet. Enable with \"metrics\": true in ~/.robodev/llm_config.json or ROBODEV_METRICS=1."
+
+    lines = []
+    if llm:
+        lines.append("LLM calls (p50/p95)")
+        lines.append(f"  {'task':12} {'model':22} {'calls':>5} {'cached':>6} {'wall':>13} {'ttft':>13} "
+                     f"{'load':>13} {'prefill':>13} {'decode':>13} {'tok/s':>7} {'prefill tok/s':>13}")
+        for (task, model), rs in sorted(llm.items()):
+            live = [r for r in rs if not r.get("cached")]
+            lines.append(
+                f"  {task:12} {model:22} {len(rs):>5} {len(rs) - len(live):>6} "
+                f"{_p50_p95([r['wall_ms'] for r in live]):>13} "
+                f"{_p50_p95([r['ttft_ms'] for r in live if 'ttft_ms' in r]):>13} "
+                f"{_p50_p95(_durations_ms(live, 'load_duration')):>13} "
+                f"{_p50_p95(_durations_ms(live, 'prompt_eval_duration')):>13} "
+                f"{_p50_p95(_durations_ms(live, 'eval_duration')):>13} "
+                f"{_fmt(percentile([r['eval_tps'] for r in live if 'eval_tps' in r], 50)):>7} "
+                f"{_fmt(percentile([r['prefill_tps'] for r in live if 'prefill_tps' in r], 50)):>13}"
+            )
+    if routes:
+        lines.append("")
+        lines.append("Routing decisions")
+        lines.append(f"  {'task':12} {'model':22} {'reason':14} {'count':>6} {'prompt tokens p50':>18}")
+        for (task, model, reason), rs in sorted(routes.items()):
+            lines.append(f"  {task:12} {model:22} {reason:14} {len(rs):>6} "
+                         f"{_fmt(percentile([r['prompt_tokens'] for r in rs], 50)):>18}")
+    if spans:
+        lines.append("")
+        lines.append("Stages (p50/p95)")
+        lines.append(f"  {'span':28} {'count':>6} {'errors':>6} {'time':>15}")
+        for name, rs in sorted(spans.items()):
+            errors = sum(1 for r in rs if r.get("error"))
+            lines.append(f"  {name:28} {len(rs):>6} {errors:>6} {_p50_p95([r['ms'] for r in rs]):>15}")
+    return "\n".join(lines)
@@ -1,28 +1,260 @@
+import fnmatch
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
 from pathlib import Path
 
-IGNORED_DIRS = [".git", "__pycache__", "build", "dist", "install", "logs"]
+IGNORED_DIRS = [".git", "__pycache__", "build", "dist", "install", "logs", "log",
+                ".venv", "venv", "node_modules", ".mypy_cache", ".pytest_cache"]
+# colcon/ament/catkin skip any directory containing one of these marker files
+IGNORE_MARKERS = ("COLCON_IGNORE", "AMENT_IGNORE", "CATKIN_IGNORE")
+INDEX_DIR = Path.home() / ".robodev" / "project_index"
+MAX_TREE_LINES = 200
+MAX_FILES_PER_DIR = 15
+# One prompt build reads the tree from several places (workspace summary,
+# retrieval); walks this close together share a single refresh
+FRESH_SECONDS = 2.0
 
-def list_project_tree(root, max_depth=5):
-    root = Path(root)
-    out = []
+_PKG_NAME_RE = re.compile(r"<name>\s*([^<\s]+)\s*</name>")
 
-    def walk(path, depth):
-        if depth > max_depth:
-            return
-        for child in sorted(path.iterdir()):
-            if child.name in IGNORED_DIRS:
+
+def atomic_write_bytes(path: Path, data: bytes, mode: int = None):
+    # Unique temp file next to the target, so concurrent writers (threads,
+    # daemon + CLI) never rename each other's half-written files. mkstemp
+    # creates it 0600; pass mode for files that aren't private state.
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        if mode is not None:
+            os.fchmod(fd, mode)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def atomic_write_text(path: Path, text: str, mode: int = None):
+    atomic_write_bytes(path, text.encode("utf-8"), mode)
+
+
+def _parse_gitignore(path: Path, base: str) -> list:
+    rules = []
+    try:
+        lines = path.read_text(encoding="utf-8", errors="ignore").splitlines()
+    except OSError:
+        return rules
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        negate = line.startswith("!")
+        if negate:
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        anchored = "/" in line
+        rules.append((base, line.lstrip("/"), negate, dir_only, anchored))
+    return rules
+
+
+def _is_ignored(rel: str, name: str, is_dir: bool, rules: list) -> bool:
+    ignored = False
+    for base, pattern, negate, dir_only, anchored in rules:
+        if dir_only and not is_dir:
+            continue
+        if anchored:
+            target = rel[len(base) + 1:] if base else rel
+            matched = fnmatch.fnmatch(target, pattern) or fnmatch.fnmatch(target, pattern.replace("**/", ""))
+        else:
+            matched = fnmatch.fnmatch(name, pattern)
+        if matched:
+            ignored = not negate
+    return ignored
+
+
+class ProjectIndex:
+    # Persistent scandir snapshot of a project tree. Each directory entry keeps
+    # its own mtime plus the raw listing (file sizes/mtimes, subdirectory
+    # names); a refresh only re-lists directories whose mtime moved. Ignore
+    # rules are applied while walking, so editing a .gitignore takes effect
+    # without a rescan.
+    def __init__(self, root):
+        self.root = Path(root).expanduser().resolve()
+        key = hashlib.sha1(str(self.root).encode()).hexdigest()[:16]
+        self.path = INDEX_DIR / f"{key}.json"
+        self.dirs = {}
+        self.ignored = {}     # marker-file directories, kept so they aren't re-listed
+        self.rescanned = 0
+        self.refreshed_at = None
+        self.lock = threading.Lock()
+        if self.path.exists():
+            try:
+                data = json.loads(self.path.read_text())
+                if data.get("root") == str(self.root):
+                    self.dirs = data.get("dirs", {})
+                    self.ignored = data.get("ignored", {})
+            except json.JSONDecodeError:
+                self.dirs, self.ignored = {}, {}
+
+    def _scan(self, abs_path: str, mtime: float) -> dict:
+        files, subdirs = {}, []
+        with os.scandir(abs_path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.name)
+                    elif entry.is_file():
+                        st = entry.stat()
+                        files[entry.name] = [st.st_size, st.st_mtime]
+                except OSError:
+                    continue
+        self.rescanned += 1
+        return {"mtime": mtime, "files": files, "subdirs": sorted(subdirs)}
+
+    def refresh(self) -> "ProjectIndex":
+        rescanned = self.rescanned
+        fresh, ignored = {}, {}
+        stack = [("", [])]
+        while stack:
+            rel, rules = stack.pop()
+            abs_path = os.path.join(self.root, rel) if rel else str(self.root)
+            try:
+                mtime = os.stat(abs_path).st_mtime
+            except OSError:
+                continue
+            entry = self.dirs.get(rel) or self.ignored.get(rel)
+            if entry is None or entry["mtime"] != mtime:
+                try:
+                    entry = self._scan(abs_path, mtime)
+                except OSError:
+                    continue
+            if any(marker in entry["files"] for marker in IGNORE_MARKERS):
+                ignored[rel] = entry
                 continue
-            out.append(" " * depth + child.name)
-            if child.is_dir():
-                walk(child, depth + 1)
+            fresh[rel] = entry
+            if ".gitignore" in entry["files"]:
+                rules = rules + _parse_gitignore(Path(abs_path) / ".gitignore", rel)
+            for name in entry["subdirs"]:
+                child = f"{rel}/{name}" if rel else name
+                if name in IGNORED_DIRS or _is_ignored(child, name, True, rules):
+                    continue
+                stack.append((child, rules))
+            entry["_rules"] = rules
+        # Dropped or newly ignored directories change the key sets without a rescan
+        changed = self.rescanned != rescanned or fresh.keys() != self.dirs.keys() or ignored.keys() != self.ignored.keys()
+        self.dirs, self.ignored = fresh, ignored
+        self.refreshed_at = time.monotonic()
+        if changed:
+            self.save()
+        return self
+
+    def save(self):
+        dirs = {rel: {k: v for k, v in e.items() if k != "_rules"} for rel, e in self.dirs.items()}
+        atomic_write_text(self.path, json.dumps({"root": str(self.root), "dirs": dirs, "ignored": self.ignored}))
+
+    @staticmethod
+    def _visible_files(rel: str, entry: dict) -> list:
+        rules = entry.get("_rules", [])
+        return sorted(
+            name for name in entry["files"]
+            if not _is_ignored(f"{rel}/{name}" if rel else name, name, False, rules)
+        )
+
+    def _visible_subdirs(self, rel: str) -> list:
+        return [
+            name for name in self.dirs[rel]["subdirs"]
+            if (f"{rel}/{name}" if rel else name) in self.dirs
+        ]
+
+    def files(self):
+        # (relative path, size, mtime) for every non-ignored file. Walks one
+        # snapshot of dirs: refresh() swaps in a new dict rather than editing it
+        dirs = self.dirs
+        for rel in sorted(dirs):
+            entry = dirs[rel]
+            for name in self._visible_files(rel, entry):
+                size, mtime = entry["files"][name]
+                yield (f"{rel}/{name}" if rel else name), size, mtime
+
+    def packages(self) -> dict:
+        # package directory -> package name, for every package.xml in the tree
+        found = {}
+        for rel, entry in self.dirs.items():
+            if "package.xml" in entry["files"]:
+                xml = (self.root / rel / "package.xml").read_text(encoding="utf-8", errors="ignore")
+                match = _PKG_NAME_RE.search(xml)
+                found[rel] = match.group(1) if match else Path(rel or self.root.name).name
+        return found
+
+    def render(self, max_depth: int = 5, max_lines: int = MAX_TREE_LINES) -> str:
+        counts = {rel: len(self._visible_files(rel, entry)) for rel, entry in self.dirs.items()}
+        total_files = sum(counts.values())
+        packages = self.packages()
+        out = [f"{self.root} — {total_files} files in {len(self.dirs)} dirs, {len(packages)} packages"]
+
+        if packages:
+            out.append("Packages:")
+            for rel, name in sorted(packages.items(), key=lambda kv: kv[1]):
+                prefix = f"{rel}/" if rel else ""
+                n = sum(c for d, c in counts.items() if d == rel or d.startswith(prefix))
+                out.append(f"  {name} ({rel or '.'}): {n} files")
+            out.append("Tree:")
+
+        lines = []
+
+        def walk(rel: str, depth: int):
+            if depth > max_depth or len(lines) > max_lines:
+                return
+            children = [(n, True) for n in self._visible_subdirs(rel)]
+            children += [(n, False) for n in self._visible_files(rel, self.dirs[rel])]
+            shown_files = 0
+            for name, is_dir in sorted(children):
+                if not is_dir:
+                    shown_files += 1
+                    if shown_files > MAX_FILES_PER_DIR:
+                        continue
+                lines.append(" " * depth + name + ("/" if is_dir else ""))
+                if is_dir:
+                    walk(f"{rel}/{name}" if rel else name, depth + 1)
+            if shown_files > MAX_FILES_PER_DIR:
+                lines.append(" " * depth + f"… {shown_files - MAX_FILES_PER_DIR} more files")
+
+        walk("", 0)
+        if len(lines) > max_lines:
+            hidden = len(lines) - max_lines
+            lines = lines[:max_lines] + [f"… output capped at {max_lines} lines ({hidden}+ more entries)"]
+        return "\n".join(out + lines)
+
+
+_INDEXES = {}
+_INDEXES_LOCK = threading.Lock()
+
+
+def project_index(root, max_age: float = FRESH_SECONDS) -> ProjectIndex:
+    # Process-wide warm index per root, refreshed at most every max_age seconds
+    key = str(Path(root).expanduser().resolve())
+    with _INDEXES_LOCK:
+        index = _INDEXES.get(key)
+        if index is None:
+            index = _INDEXES[key] = ProjectIndex(key)
+    with index.lock:
+        if index.refreshed_at is None or time.monotonic() - index.refreshed_at > max_age:
+            index.refresh()
+    return index
 
 
-    walk(root, 0)
-    return '\n'.join(out)
+def list_project_tree(root, max_depth=5, max_lines=MAX_TREE_LINES):
+    return ProjectIndex(root).refresh().render(max_depth=max_depth, max_lines=max_lines)
 
 def read_project_file(root, rel_path, max_chars = 10000):
     p = Path(root) / rel_path
     if not p.exists() or not p.is_file():
         return FileNotFoundError(f"File not found: {rel_path}")
     text = p.read_text(encoding="utf-8", errors="ignore")
-    return text[:max_chars]
\ No newline at end of file
+    return text[:max_chars]
@@ -1,46 +1,47 @@
+# Prompt layout is prefix-stable on purpose: the system message carries only
+# slow-changing text (rules, user profile, project/workspace summary) in a
+# fixed order, so it is byte-identical across calls and tasks and Ollama can
+# reuse its KV cache for it. Everything per-request (task instructions,
+# retrieved code, the query or log) goes in the final user message.
+
+PROFILE_FIELDS = (
+    ("Stack", "stack"),
+    ("Simulator", "sim"),
+    ("Language", "language"),
+    ("Robot Type", "robot_type"),
+    ("Style", "style"),
+)
+
 def system_prompt(memory) -> str:
     m = memory.data
-    return f"""
-You are RoboDev, a robotics engineering assistant/expert that produces practical engineering outputs.
-User context defaults:
-- Stack: {m.get("stack")}
-- Simulator: {m.get("sim")}
-- Language: {m.get("language")}
-- Robot Type: {m.get("robot_type")}
-Style: {m.get("style")}
+    profile = "\n".join(f"- {label}: {m.get(key)}" for label, key in PROFILE_FIELDS)
+    return f"""You are RoboDev, a robotics engineering assistant/expert that produces practical engineering outputs.
 
 Rules:
 - Be specific, robotics-first (control, planning, perception, integration).
 - When generating artifacts, output in STRICT sections with filenames.
 - Avoid fluff. Provide runnable skeletons and clear TODOs.
-"""
 
-def brainstorm_prompt(memory, query:str) -> str:
-    return f"""
-Task: Brainstorm robotics approaches/solutions
+User context defaults:
+{profile}
 
 {project_context(memory)}
+"""
 
-User query: {query}
+def brainstorm_prompt(memory, query:str) -> str:
+    return f"""Task: Brainstorm robotics approaches/solutions
 
 Output format:
 1) Assumptions(bullet list)
 2) 2-3 approaches/solutions (each with: idea, when to use, pros/cons, pitfalls, tuning knobs)
 3) Recommended approach/solution + why
 4) Implementation plan (steps, resources, timeline)
+{retrieved_context(memory, query)}
+User query: {query}
 """
 
 def codegen_prompt(memory, query:str, lang:str, xml: str) -> str:
-    return f"""
-Task: Generate robotics artifacts
-
-{project_context(memory)}
-
-User query: {query}
-
-Constraints:
-- Language: {lang}
-- XML type: {xml}
+    return f"""Task: Generate robotics artifacts
 
 Output MUST follow this exact structure.
 
@@ -51,13 +52,17 @@ Output MUST follow this exact structure.
 # filename: <relative_path_to_file>
 ```<language or text>
 <file content>
+```
+{retrieved_context(memory, query)}
+Constraints:
+- Language: {lang}
+- XML type: {xml}
+
+User query: {query}
 """
 
 def diagnose_prompt(memory, log_text: str) -> str:
-    return f"""
-Task: Diagnose robotics compile/build errors and propose minimal fixes.
-
-Log text: {log_text}
+    return f"""Task: Diagnose robotics compile/build errors and propose minimal fixes.
 
 Output format:
 1) Observations (bullet list)
@@ -65,10 +70,28 @@ Output format:
 3) Fix plan (ordered steps)
 4) Patch Suggestions (show diffs if applicable)
 5) Verification steps (how to confirm the fix works)
+{retrieved_context(memory, log_text)}
+Log text: {log_text}
 """
 
 def project_context(memory):
+    # Stable part only; per-query code snippets come from retrieved_context
     root = memory.data.get("project_root")
     if not root:
         return "Project root is not set."
-    return f"Project root: {root}"
\ No newline at end of file
+    context = f"Project root: {root}"
+    from robodev.workspace import workspace_for
+    packages = workspace_for(root).summary()
+    if packages:
+        context += f"\n{packages}"
+    return context
+
+def retrieved_context(memory, query: str) -> str:
+    root = memory.data.get("project_root")
+    if not root or not query or str(memory.data.get("retrieval", True)).lower() in ("false", "0", "off"):
+        return ""
+    from robodev.retrieval import project_snippets
+    snippets = project_snippets(root, query, max_chars=int(memory.data.get("context_chars", 4000)))
+    if not snippets:
+        return ""
+    return f"\nRelevant project code (path:lines):\n{snippets}\n"
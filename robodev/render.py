@@ -1,18 +1,39 @@
+import sys
 from pathlib import Path
-from typing import List
+from typing import Iterable, List
 
-def render_brainstorm(text: str) -> str:
+def render_stream(chunks: Iterable[str], out=None) -> str:
+    # Echo tokens to the terminal (or a daemon client) as they arrive and return the full text
+    out = out or sys.stdout
+    parts = []
+    for chunk in chunks:
+        out.write(chunk)
+        out.flush()
+        parts.append(chunk)
+    out.write("\n")
+    out.flush()
+    return "".join(parts)
+
+def render_brainstorm(text: str, streamed: bool = False) -> str:
+    if streamed:
+        return ""
     return text.strip()
 
-def render_codegen(text: str, files: List[Path]) -> str:
-    lines = [text.strip(), ""]
+def render_codegen(text: str, files: List[Path], streamed: bool = False, unchanged: List[Path] = ()) -> str:
+    lines = [] if streamed else [text.strip(), ""]
     if files:
         lines.append("Wrote files:")
         for f in files:
             lines.append(f" - {f}")
-    else:
+    if unchanged:
+        lines.append("Unchanged (left as is):")
+        for f in unchanged:
+            lines.append(f" - {f}")
+    if not files and not unchanged:
         lines.append("No files were written.")
     return "\n".join(lines)
 
-def render_diagnose(text: str) -> str:
-    return text.strip()
\ No newline at end of file
+def render_diagnose(text: str, streamed: bool = False) -> str:
+    if streamed:
+        return ""
+    return text.strip()
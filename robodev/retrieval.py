@@ -0,0 +1,174 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List
+from robodev.bm25 import BM25, tokenize
+from robodev.project import FRESH_SECONDS, atomic_write_text, project_index
+
+INDEX_DIR = Path.home() / ".robodev" / "retrieval"
+SOURCE_SUFFIXES = {
+    ".py", ".cpp", ".cc", ".cxx", ".c", ".h", ".hpp", ".hh",
+    ".launch", ".urdf", ".xacro", ".sdf", ".world", ".yaml", ".yml",
+    ".msg", ".srv", ".action",
+}
+SOURCE_NAMES = {"CMakeLists.txt", "package.xml", "setup.py", "setup.cfg"}
+MAX_FILE_BYTES = 512 * 1024
+CHUNK_LINES = 40
+CHUNK_STEP = 30          # consecutive chunks overlap by 10 lines
+DEFAULT_TOP_K = 5
+DEFAULT_MAX_CHARS = 4000
+
+
+@dataclass
+class Chunk:
+    path: str
+    start: int           # 1-based, inclusive
+    end: int
+    score: float
+
+
+def _is_source(rel: str) -> bool:
+    name = os.path.basename(rel)
+    if name in SOURCE_NAMES or name.endswith(".launch.xml"):
+        return True
+    return os.path.splitext(name)[1].lower() in SOURCE_SUFFIXES
+
+
+def _chunk_file(path: Path) -> list:
+    lines = path.read_text(encoding="utf-8", errors="ignore").splitlines()
+    chunks = []
+    # The file path itself is searchable ("lidar_driver" finds lidar_driver.cpp)
+    path_terms = tokenize(str(path.name))
+    for start in range(0, max(len(lines), 1), CHUNK_STEP):
+        window = lines[start:start + CHUNK_LINES]
+        counts = Counter(tokenize("\n".join(window)) + path_terms)
+        if counts:
+            chunks.append([start + 1, start + len(window), dict(counts)])
+        if start + CHUNK_LINES >= len(lines):
+            break
+    return chunks
+
+
+class CodeIndex:
+    # Chunked BM25 index over a project's source/launch/model/build files.
+    # Per-file chunk term counts persist between runs; refresh() re-chunks only
+    # files whose size or mtime changed.
+    def __init__(self, root):
+        self.root = Path(root).expanduser().resolve()
+        key = hashlib.sha1(str(self.root).encode()).hexdigest()[:16]
+        self.path = INDEX_DIR / f"{key}.json"
+        self.files = {}
+        self._bm25 = None
+        self._refs = []
+        # Shared across daemon/batch threads via _INDEXES
+        self._lock = threading.Lock()
+        self.refreshed_at = None
+        if self.path.exists():
+            try:
+                data = json.loads(self.path.read_text())
+                if data.get("root") == str(self.root):
+                    self.files = data.get("files", {})
+            except json.JSONDecodeError:
+                self.files = {}
+
+    def refresh(self, max_age: float = 0.0) -> int:
+        with self._lock:
+            if self.refreshed_at is not None and time.monotonic() - self.refreshed_at <= max_age:
+                return 0
+            changed = self._refresh()
+            self.refreshed_at = time.monotonic()
+            return changed
+
+    def _refresh(self) -> int:
+        changed = 0
+        current = {}
+        root = str(self.root)
+        index = project_index(self.root)
+        # Another thread's refresh may swap the index's dirs mid-walk
+        with index.lock:
+            files = [rel for rel, _, _ in index.files()]
+        for rel in files:
+            if not _is_source(rel):
+                continue
+            # Directory mtimes don't move on in-place edits, so stat each file
+            try:
+                st = os.stat(os.path.join(root, rel))
+            except OSError:
+                continue
+            if st.st_size > MAX_FILE_BYTES:
+                continue
+            entry = self.files.get(rel)
+            if entry is None or entry["mtime"] != st.st_mtime or entry["size"] != st.st_size:
+                try:
+                    entry = {"mtime": st.st_mtime, "size": st.st_size, "chunks": _chunk_file(self.root / rel)}
+                except OSError:
+                    continue
+                changed += 1
+            current[rel] = entry
+        if changed or len(current) != len(self.files):
+            self.files = current
+            self._bm25 = None
+            self.save()
+        return changed
+
+    def save(self):
+        atomic_write_text(self.path, json.dumps({"root": str(self.root), "files": self.files}))
+
+    def _ensure_bm25(self):
+        if self._bm25 is None:
+            self._refs = [(rel, c[0], c[1]) for rel, e in self.files.items() for c in e["chunks"]]
+            self._bm25 = BM25.from_counts([c[2] for e in self.files.values() for c in e["chunks"]])
+        return self._bm25
+
+    def search(self, query: str, k: int = DEFAULT_TOP_K) -> List[Chunk]:
+        terms = tokenize(query)
+        with self._lock:
+            if not terms or not self.files:
+                return []
+            scores = self._ensure_bm25().scores(terms)
+            refs = self._refs
+        ranked = sorted(range(len(scores)), key=scores.__getitem__, reverse=True)
+        hits = []
+        for i in ranked[:k]:
+            if scores[i] <= 0:
+                break
+            rel, start, end = refs[i]
+            hits.append(Chunk(rel, start, end, scores[i]))
+        return hits
+
+    def context(self, query: str, k: int = DEFAULT_TOP_K, max_chars: int = DEFAULT_MAX_CHARS) -> str:
+        parts, used = [], 0
+        for chunk in self.search(query, k=k):
+            try:
+                lines = (self.root / chunk.path).read_text(encoding="utf-8", errors="ignore").splitlines()
+            except OSError:
+                continue
+            body = "\n".join(lines[chunk.start - 1:chunk.end])
+            block = f"--- {chunk.path}:{chunk.start}-{chunk.end}\n{body}"
+            if used + len(block) > max_chars:
+                remaining = max_chars - used
+                if remaining < 200:
+                    break
+                block = block[:remaining] + "\n…"
+            parts.append(block)
+            used += len(block)
+        return "\n".join(parts)
+
+
+# Loaded indexes stay warm for the life of the process
+_INDEXES = {}
+_INDEXES_LOCK = threading.Lock()
+
+
+def project_snippets(root, query: str, k: int = DEFAULT_TOP_K, max_chars: int = DEFAULT_MAX_CHARS) -> str:
+    with _INDEXES_LOCK:
+        index = _INDEXES.get(str(root))
+        if index is None:
+            index = _INDEXES[str(root)] = CodeIndex(root)
+    index.refresh(max_age=FRESH_SECONDS)
+    return index.context(query, k=k, max_chars=max_chars)
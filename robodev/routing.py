@@ -0,0 +1,143 @@
+import json
+import threading
+from typing import Callable, List, Optional
+from robodev import metrics
+from robodev.session import estimate_tokens
+
+# Used until a model has been observed; deliberately pessimistic for big models
+DEFAULT_PREFILL_TPS = 400.0
+DEFAULT_EVAL_TPS = 20.0
+DEFAULT_OUTPUT_TOKENS = 400
+DEFAULT_MAX_PROMPT_TOKENS = 8192
+HISTORY_RECORDS = 2000     # most recent metrics records used to seed latency history
+ALPHA = 0.2                # EWMA weight of each new observation
+
+# llm_config.json:
+#   "routing": {
+#     "models": {"qwen2.5:3b":  {"quality": 1, "max_prompt_tokens": 4096},
+#                "qwen2.5:14b": {"quality": 2, "max_prompt_tokens": 16384}},
+#     "tasks":  {"brainstorm": {"candidates": ["qwen2.5:3b", "qwen2.5:14b"], "slo_ms": 8000, "min_quality": 1},
+#                "diagnose":   {"candidates": ["qwen2.5:3b", "qwen2.5:14b"], "slo_ms": 60000, "min_quality": 2}}
+#   }
+# Candidates are listed cheapest first. Tasks without an entry use the fixed
+# "tasks"/"default" mapping.
+
+
+def _ewma(old: Optional[float], new: float) -> float:
+    return new if old is None else (1 - ALPHA) * old + ALPHA * new
+
+
+class ModelStats:
+    def __init__(self):
+        self.prefill_tps = None
+        self.eval_tps = None
+        self.load_ms = None
+
+    def observe(self, stats: dict):
+        if stats.get("prompt_eval_duration") and stats.get("prompt_eval_count"):
+            self.prefill_tps = _ewma(self.prefill_tps, stats["prompt_eval_count"] / (stats["prompt_eval_duration"] / 1e9))
+        if stats.get("eval_duration") and stats.get("eval_count"):
+            self.eval_tps = _ewma(self.eval_tps, stats["eval_count"] / (stats["eval_duration"] / 1e9))
+        if "load_duration" in stats:
+            self.load_ms = _ewma(self.load_ms, stats["load_duration"] / 1e6)
+
+    @property
+    def known(self) -> bool:
+        return self.eval_tps is not None
+
+
+class Router:
+    def __init__(self, config: dict):
+        self.models = config.get("models", {})
+        self.tasks = config.get("tasks", {})
+        self.stats = {}
+        self.output_tokens = {}
+        self._lock = threading.Lock()
+        if self.tasks:
+            self._seed()
+
+    def _seed(self):
+        # Start from what earlier runs recorded, when the metrics log exists
+        for r in metrics.load()[-HISTORY_RECORDS:]:
+            if r.get("type") == "llm" and not r.get("cached"):
+                self.observe(r["task"], r["model"], r)
+
+    def handles(self, task: str) -> bool:
+        # An entry without candidates falls back to the configured model
+        return bool(self.tasks.get(task, {}).get("candidates"))
+
+    def observe(self, task: str, model: str, stats: dict):
+        with self._lock:
+            self.stats.setdefault(model, ModelStats()).observe(stats)
+            if stats.get("eval_count"):
+                key = task or "default"
+                self.output_tokens[key] = _ewma(self.output_tokens.get(key), stats["eval_count"])
+
+    def estimate_ms(self, model: str, task: str, prompt_tokens: int) -> Optional[float]:
+        s = self.stats.get(model)
+        if s is None or not s.known:
+            return None
+        output = self.output_tokens.get(task, DEFAULT_OUTPUT_TOKENS)
+        prefill = prompt_tokens / (s.prefill_tps or DEFAULT_PREFILL_TPS) * 1000
+        return (s.load_ms or 0.0) + prefill + output / (s.eval_tps or DEFAULT_EVAL_TPS) * 1000
+
+    def choose(self, task: str, messages: List[dict], healthy: Callable[[str], bool] = None) -> str:
+        # healthy(model): whether a working host serves the model right now
+        policy = self.tasks[task]
+        candidates = policy.get("candidates", [])
+        slo = policy.get("slo_ms")
+        min_quality = policy.get("min_quality", 0)
+        prompt_tokens = sum(estimate_tokens(m.get("content", "")) for m in messages)
+
+        def spec(model, key, default):
+            return self.models.get(model, {}).get(key, default)
+
+        # When no candidate has a healthy host, keep them all and let the
+        # backend pool pick the host closest to recovery
+        live = [m for m in candidates if healthy is None or healthy(m)] or candidates
+        fits = [m for m in live if prompt_tokens <= spec(m, "max_prompt_tokens", DEFAULT_MAX_PROMPT_TOKENS)]
+        estimates = {m: self.estimate_ms(m, task, prompt_tokens) for m in candidates}
+        # The reason records why the cheapest candidate was passed over, if it was
+        reason = None
+        model = None
+        for m in candidates:
+            # Unobserved models count as meeting the SLO so they get tried
+            est = estimates[m]
+            if m not in live:
+                skipped = "unavailable"
+            elif m not in fits:
+                skipped = "fits-context"
+            elif spec(m, "quality", 0) < min_quality:
+                skipped = "quality"
+            elif slo is not None and est is not None and est > slo:
+                skipped = "slo"
+            else:
+                model = m
+                reason = reason or "cheapest"
+                break
+            reason = reason or skipped
+        if model is None and fits:
+            # Nothing meets both bars: take the fastest model that can hold the prompt
+            model = min(fits, key=lambda m: estimates[m] if estimates[m] is not None else float("inf"))
+            reason = "slo_fallback"
+        if model is None:
+            # Prompt is larger than every candidate's limit; use the roomiest
+            model = max(live, key=lambda m: spec(m, "max_prompt_tokens", DEFAULT_MAX_PROMPT_TOKENS))
+            reason = "oversize"
+
+        metrics.record_route(task, model, reason, prompt_tokens, slo,
+                             {m: round(e) for m, e in estimates.items() if e is not None})
+        return model
+
+
+_ROUTERS = {}
+_ROUTERS_LOCK = threading.Lock()
+
+
+def router_for(config: dict) -> Router:
+    # Shared per routing config so every client in a process learns from all calls
+    key = json.dumps(config, sort_keys=True)
+    with _ROUTERS_LOCK:
+        if key not in _ROUTERS:
+            _ROUTERS[key] = Router(config)
+        return _ROUTERS[key]
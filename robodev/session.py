@@ -0,0 +1,150 @@
+import json
+import re
+import time
+from pathlib import Path
+from typing import List
+
+from robodev.project import atomic_write_text
+
+SESSION_DIR = Path.home() / ".robodev" / "sessions"
+DEFAULT_HISTORY_TOKENS = 3000
+KEEP_RECENT_TURNS = 3        # at most this many turns survive a compaction verbatim
+COMPACT_ABOVE = 1.5          # compact once history passes budget × this ...
+COMPACT_TO = 0.5             # ... and fold turns until it is under budget × this
+MAX_TURN_CHARS = 4000        # per stored message; logs and code get clipped
+SUMMARY_MAX_CHARS = 2000
+
+SUMMARY_PROMPT = """Update the running summary of an engineering conversation.
+Keep decisions, constraints, file/package names, errors and open questions. Drop pleasantries.
+At most {max_words} words.
+
+Current summary:
+{summary}
+
+New turns to fold in:
+{turns}
+
+Updated summary:"""
+
+_NAME_RE = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English and code; close enough for budgeting
+    return len(text) // 4 + 1
+
+
+def _clip(text: str) -> str:
+    text = text.strip()
+    if len(text) <= MAX_TURN_CHARS:
+        return text
+    return text[:MAX_TURN_CHARS] + "\n…[truncated]"
+
+
+class Session:
+    # Per-mode conversation history: a rolling LLM summary of older turns plus
+    # the most recent turns verbatim, persisted under ~/.robodev/sessions/.
+    def __init__(self, name: str = "default", modes: dict = None, contexts: dict = None):
+        self.name = _NAME_RE.sub("_", name) or "default"
+        self.modes = modes or {}
+        # mode -> Ollama token context, when the client carries context
+        self.contexts = contexts or {}
+
+    @staticmethod
+    def path_for(name: str) -> Path:
+        return SESSION_DIR / f"{_NAME_RE.sub('_', name) or 'default'}.json"
+
+    @classmethod
+    def load(cls, name: str = "default") -> "Session":
+        p = cls.path_for(name)
+        if p.exists():
+            try:
+                data = json.loads(p.read_text())
+                return cls(name, data.get("modes", {}), data.get("contexts", {}))
+            except json.JSONDecodeError:
+                pass
+        return cls(name)
+
+    @staticmethod
+    def list_sessions() -> List[str]:
+        if not SESSION_DIR.exists():
+            return []
+        return sorted(p.stem for p in SESSION_DIR.glob("*.json"))
+
+    def save(self):
+        atomic_write_text(self.path_for(self.name), json.dumps({
+            "name": self.name,
+            "updated": time.time(),
+            "modes": self.modes,
+            "contexts": self.contexts,
+        }))
+
+    def clear(self, mode: str = None):
+        if mode:
+            self.modes.pop(mode, None)
+            self.contexts.pop(mode, None)
+        else:
+            self.modes, self.contexts = {}, {}
+
+    def _mode(self, mode: str) -> dict:
+        return self.modes.setdefault(mode, {"summary": "", "turns": []})
+
+    def add_turn(self, mode: str, user: str, assistant: str):
+        self._mode(mode)["turns"].append({"user": _clip(user), "assistant": _clip(assistant)})
+
+    def tokens(self, mode: str) -> int:
+        m = self._mode(mode)
+        return estimate_tokens(m["summary"]) + sum(
+            estimate_tokens(t["user"]) + estimate_tokens(t["assistant"]) for t in m["turns"]
+        )
+
+    def history(self, mode: str, budget: int = DEFAULT_HISTORY_TOKENS) -> list:
+        # Newest turns first until the budget runs out, then restore order
+        m = self._mode(mode)
+        msgs = []
+        used = 0
+        if m["summary"]:
+            used = estimate_tokens(m["summary"])
+        for turn in reversed(m["turns"]):
+            cost = estimate_tokens(turn["user"]) + estimate_tokens(turn["assistant"])
+            if used + cost > budget:
+                break
+            msgs[:0] = [
+                {"role": "user", "content": turn["user"]},
+                {"role": "assistant", "content": turn["assistant"]},
+            ]
+            used += cost
+        if m["summary"]:
+            msgs.insert(0, {"role": "system", "content": f"Summary of earlier conversation:\n{m['summary']}"})
+        return msgs
+
+    def compact(self, mode: str, llm, budget: int = DEFAULT_HISTORY_TOKENS) -> bool:
+        # Fold older turns into the rolling summary once the history outgrows
+        # its budget. history() already trims prompts to the budget, so wait for
+        # some slack and compact well below it: one summarize call per few turns
+        # rather than one after every answer.
+        m = self._mode(mode)
+        if self.tokens(mode) <= budget * COMPACT_ABOVE or len(m["turns"]) <= 1:
+            return False
+        keep, used = 0, estimate_tokens(m["summary"])
+        for turn in reversed(m["turns"][-KEEP_RECENT_TURNS:]):
+            used += estimate_tokens(turn["user"]) + estimate_tokens(turn["assistant"])
+            if keep and used > budget * COMPACT_TO:
+                break
+            keep += 1
+        keep = min(keep, len(m["turns"]) - 1)
+        old, m["turns"] = m["turns"][:-keep], m["turns"][-keep:]
+        turns = "\n\n".join(f"User: {t['user']}\nAssistant: {t['assistant']}" for t in old)
+        prompt = SUMMARY_PROMPT.format(
+            max_words=SUMMARY_MAX_CHARS // 6,
+            summary=m["summary"] or "(none)",
+            turns=turns,
+        )
+        try:
+            summary = llm.chat(prompt, timeout=120, task="summarize").strip()
+        except Exception as e:
+            # No model available: keep a clipped transcript rather than losing the turns
+            print(f"⚠ Session summary failed, keeping truncated history: {e}")
+            summary = f"{m['summary']}\n{turns}".strip()
+        m["summary"] = summary[-SUMMARY_MAX_CHARS:]
+        return True
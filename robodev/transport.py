@@ -0,0 +1,86 @@
+import http.client
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+# Errors that mean a kept-alive socket was dropped by the server; the request
+# never reached it, so it is safe to retry once on a fresh connection.
+STALE_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.CannotSendRequest,
+    ConnectionResetError,
+    BrokenPipeError,
+)
+
+
+class ConnectionPool:
+    def __init__(self, max_idle_per_host: int = 8):
+        self.max_idle_per_host = max_idle_per_host
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def _connect(self, scheme: str, netloc: str, timeout: float) -> http.client.HTTPConnection:
+        if scheme == "https":
+            return http.client.HTTPSConnection(netloc, timeout=timeout)
+        return http.client.HTTPConnection(netloc, timeout=timeout)
+
+    def _acquire(self, scheme: str, netloc: str, timeout: float):
+        with self._lock:
+            idle = self._idle.get((scheme, netloc))
+            conn = idle.pop() if idle else None
+        if conn is None:
+            return self._connect(scheme, netloc, timeout), False
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        return conn, True
+
+    def _release(self, scheme: str, netloc: str, conn: http.client.HTTPConnection):
+        with self._lock:
+            idle = self._idle.setdefault((scheme, netloc), [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append(conn)
+                return
+        conn.close()
+
+    @contextmanager
+    def request(self, method: str, url: str, body: bytes = None, headers: dict = None, timeout: float = 600):
+        parts = urlsplit(url)
+        scheme, netloc = parts.scheme or "http", parts.netloc
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+
+        for attempt in range(2):
+            conn, reused = self._acquire(scheme, netloc, timeout)
+            try:
+                conn.request(method, path, body=body, headers=headers or {})
+                resp = conn.getresponse()
+                break
+            except STALE_ERRORS:
+                conn.close()
+                if not reused or attempt:
+                    raise
+            except Exception:
+                conn.close()
+                raise
+
+        try:
+            yield resp
+        finally:
+            # Only a fully consumed response leaves the socket reusable
+            if resp.isclosed() and not resp.will_close:
+                self._release(scheme, netloc, conn)
+            else:
+                conn.close()
+
+    def close(self):
+        with self._lock:
+            conns = [c for idle in self._idle.values() for c in idle]
+            self._idle.clear()
+        for conn in conns:
+            conn.close()
+
+
+# Shared by every client in the process so sockets survive across calls
+POOL = ConnectionPool()
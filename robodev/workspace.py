@@ -0,0 +1,210 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import xml.etree.ElementTree as ET
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+from robodev.project import atomic_write_text, project_index
+
+CACHE_DIR = Path.home() / ".robodev" / "workspace"
+MANIFESTS = ("package.xml", "CMakeLists.txt", "setup.py")
+DEP_TAGS = ("depend", "build_depend", "build_export_depend", "exec_depend",
+            "run_depend", "test_depend", "buildtool_depend")
+
+_FIND_PACKAGE_RE = re.compile(r"find_package\s*\(\s*([A-Za-z0-9_]+)", re.IGNORECASE)
+
+
+@dataclass
+class Package:
+    name: str
+    path: str                 # directory relative to the project root
+    build_type: str = ""
+    version: str = ""
+    deps: Dict[str, List[str]] = field(default_factory=dict)
+    mtimes: Dict[str, float] = field(default_factory=dict)
+
+    def all_deps(self) -> List[str]:
+        return sorted({d for deps in self.deps.values() for d in deps})
+
+
+def _parse_package(root: Path, rel: str, mtimes: dict) -> Optional[Package]:
+    pkg_dir = root / rel
+    try:
+        xml = ET.parse(pkg_dir / "package.xml").getroot()
+    except (ET.ParseError, OSError):
+        return None
+    name = (xml.findtext("name") or Path(rel).name).strip()
+    deps = {}
+    for tag in DEP_TAGS:
+        found = sorted({(e.text or "").strip() for e in xml.findall(tag) if (e.text or "").strip()})
+        if found:
+            deps[tag] = found
+
+    build_type = (xml.findtext("export/build_type") or "").strip()
+    if "CMakeLists.txt" in mtimes:
+        cmake = (pkg_dir / "CMakeLists.txt").read_text(encoding="utf-8", errors="ignore")
+        # find_package() catches deps missing from package.xml, a classic build failure
+        found = sorted(set(_FIND_PACKAGE_RE.findall(cmake)) - {name} - set(
+            d for ds in deps.values() for d in ds))
+        if found:
+            deps["cmake_only"] = found
+        build_type = build_type or ("catkin" if "catkin" in deps.get("buildtool_depend", []) else "ament_cmake")
+    elif "setup.py" in mtimes:
+        build_type = build_type or "ament_python"
+    return Package(name=name, path=rel, build_type=build_type,
+                   version=(xml.findtext("version") or "").strip(), deps=deps, mtimes=mtimes)
+
+
+class Workspace:
+    # Package/dependency graph for the ROS workspace under a project root.
+    # Parsed packages are cached on disk and re-parsed only when one of their
+    # manifests (package.xml, CMakeLists.txt, setup.py) changes mtime.
+    def __init__(self, root):
+        self.root = Path(root).expanduser().resolve()
+        key = hashlib.sha1(str(self.root).encode()).hexdigest()[:16]
+        self.path = CACHE_DIR / f"{key}.json"
+        self.packages: Dict[str, Package] = {}
+        self.lock = threading.Lock()
+        cached = {}
+        if self.path.exists():
+            try:
+                data = json.loads(self.path.read_text())
+                if data.get("root") == str(self.root):
+                    cached = {p["path"]: Package(**p) for p in data.get("packages", [])}
+            except (json.JSONDecodeError, TypeError):
+                cached = {}
+        self._load(cached)
+
+    def refresh(self) -> "Workspace":
+        with self.lock:
+            self._load({p.path: p for p in self.packages.values()})
+        return self
+
+    def _load(self, cached: Dict[str, Package]):
+        index = project_index(self.root)
+        packages = {}
+        dirty = False
+        root = str(self.root)
+        for rel, entry in index.dirs.items():
+            if "package.xml" not in entry["files"]:
+                continue
+            mtimes = {}
+            for manifest in MANIFESTS:
+                if manifest in entry["files"]:
+                    try:
+                        mtimes[manifest] = os.stat(os.path.join(root, rel, manifest)).st_mtime
+                    except OSError:
+                        continue
+            pkg = cached.get(rel)
+            if pkg is None or pkg.mtimes != mtimes:
+                pkg = _parse_package(self.root, rel, mtimes)
+                dirty = True
+                if pkg is None:
+                    continue
+            packages[pkg.name] = pkg
+        self.packages = packages
+        if dirty or len(packages) != len(cached):
+            self.save()
+
+    def save(self):
+        atomic_write_text(self.path, json.dumps({
+            "root": str(self.root),
+            "packages": [asdict(p) for p in self.packages.values()],
+        }))
+
+    def dependencies(self, name: str, recursive: bool = False) -> List[str]:
+        # Only workspace-local packages; system deps (rclcpp, ...) are in Package.deps
+        seen, todo = set(), [name]
+        while todo:
+            pkg = self.packages.get(todo.pop())
+            if pkg is None:
+                continue
+            for dep in pkg.all_deps():
+                if dep in self.packages and dep not in seen:
+                    seen.add(dep)
+                    if recursive:
+                        todo.append(dep)
+        return sorted(seen)
+
+    def reverse_dependencies(self, name: str, recursive: bool = True) -> List[str]:
+        users = {n: [] for n in self.packages}
+        for pkg in self.packages.values():
+            for dep in pkg.all_deps():
+                if dep in users:
+                    users[dep].append(pkg.name)
+        seen, todo = set(), [name]
+        while todo:
+            for user in users.get(todo.pop(), []):
+                if user not in seen:
+                    seen.add(user)
+                    if recursive:
+                        todo.append(user)
+        return sorted(seen)
+
+    def build_order(self) -> List[str]:
+        # Kahn's algorithm; ties broken by name so the order is stable.
+        # Packages caught in a cycle go last rather than disappearing.
+        remaining = {n: set(self.dependencies(n)) for n in self.packages}
+        order = []
+        while remaining:
+            ready = sorted(n for n, deps in remaining.items() if not deps)
+            if not ready:
+                order.extend(sorted(remaining))
+                break
+            for n in ready:
+                order.append(n)
+                del remaining[n]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+        return order
+
+    def owner_of(self, path) -> Optional[str]:
+        p = Path(path)
+        try:
+            rel = (p if not p.is_absolute() else p.resolve().relative_to(self.root)).as_posix()
+        except ValueError:
+            return None
+        best = None
+        for pkg in self.packages.values():
+            prefix = pkg.path + "/" if pkg.path else ""
+            if rel == pkg.path or rel.startswith(prefix):
+                if best is None or len(pkg.path) > len(best.path):
+                    best = pkg
+        return best.name if best else None
+
+    def summary(self, max_chars: int = 1500) -> str:
+        if not self.packages:
+            return ""
+        lines = [f"Workspace packages ({len(self.packages)}, in build order):"]
+        used = len(lines[0])
+        for name in self.build_order():
+            pkg = self.packages[name]
+            local = self.dependencies(name)
+            line = f"- {name} [{pkg.build_type or '?'}] {pkg.path}"
+            if local:
+                line += f" <- {', '.join(local)}"
+            if used + len(line) + 1 > max_chars:
+                lines.append(f"- … {len(self.packages) - len(lines) + 1} more")
+                break
+            lines.append(line)
+            used += len(line) + 1
+        return "\n".join(lines)
+
+
+
+_WORKSPACES = {}
+_WORKSPACES_LOCK = threading.Lock()
+
+
+def workspace_for(root) -> Workspace:
+    # Parsed workspace stays warm for the life of the process, like retrieval's indexes
+    key = str(Path(root).expanduser().resolve())
+    with _WORKSPACES_LOCK:
+        ws = _WORKSPACES.get(key)
+        if ws is None:
+            _WORKSPACES[key] = Workspace(key)
+            return _WORKSPACES[key]
+    return ws.refresh()
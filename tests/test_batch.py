@@ -0,0 +1,66 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+from fixtures import FakeOllama
+
+
+def _workspace(root: Path, packages: int = 60):
+    for p in range(packages):
+        pkg = root / "src" / f"pkg_{p}"
+        (pkg / "src").mkdir(parents=True)
+        deps = "".join(f"<depend>pkg_{d}</depend>" for d in range(max(0, p - 2), p))
+        (pkg / "package.xml").write_text(
+            f'<?xml version="1.0"?><package format="3"><name>pkg_{p}</name>{deps}'
+            "<export><build_type>ament_cmake</build_type></export></package>"
+        )
+        (pkg / "CMakeLists.txt").write_text(f"project(pkg_{p})\n")
+        for f in range(5):
+            (pkg / "src" / f"node_{f}.cpp").write_text(f"// lidar odometry node {f}\nint main() {{ return {f}; }}\n")
+
+
+def _run_batch(tmp_path: Path, jobs: list, ollama: FakeOllama, workers: int = 8):
+    home = tmp_path / "home"
+    (home / ".robodev").mkdir(parents=True)
+    (home / ".robodev" / "llm_config.json").write_text(json.dumps({"host": ollama.url, "cache": {"enabled": False}}))
+    ws = tmp_path / "ws"
+    _workspace(ws)
+    (home / ".robodev_memory.json").write_text(json.dumps({"project_root": str(ws), "stack": "ROS2"}))
+    jobs_path = tmp_path / "jobs.jsonl"
+    jobs_path.write_text("\n".join(json.dumps(j) for j in jobs) + "\n")
+    out = tmp_path / "results.jsonl"
+    proc = subprocess.run(
+        [sys.executable, "-m", "robodev.cli", "--no-daemon", "batch", str(jobs_path),
+         "--out", str(out), "--workers", str(workers), "--retries", "0"],
+        cwd=tmp_path, capture_output=True, text=True,
+        env={**os.environ, "HOME": str(home), "PYTHONPATH": str(ROOT)},
+    )
+    records = [json.loads(line) for line in out.read_text().splitlines()] if out.exists() else []
+    return proc, records
+
+
+def test_concurrent_jobs_with_project_root(tmp_path):
+    jobs = [{"id": f"j{i}", "task": "brainstorm", "query": f"lidar odometry node {i}"} for i in range(16)]
+    with FakeOllama(latency=0.01, chunk_rate=5000) as ollama:
+        proc, records = _run_batch(tmp_path, jobs, ollama)
+    assert proc.returncode == 0, proc.stdout + proc.stderr
+    assert sorted(r["id"] for r in records) == sorted(j["id"] for j in jobs)
+    assert all(r["ok"] for r in records), [r.get("error") for r in records if not r["ok"]]
+    leftovers = [p for p in (tmp_path / "home" / ".robodev").rglob("*.tmp")]
+    assert not leftovers
+
+
+def test_failed_job_sets_exit_code(tmp_path):
+    jobs = [
+        {"id": "ok", "task": "brainstorm", "query": "ekf"},
+        {"id": "bad", "task": "diagnose", "log": str(tmp_path / "missing.log")},
+    ]
+    with FakeOllama(latency=0.01, chunk_rate=5000) as ollama:
+        proc, records = _run_batch(tmp_path, jobs, ollama, workers=2)
+    assert proc.returncode == 1
+    assert {r["id"]: r["ok"] for r in records} == {"ok": True, "bad": False}